@@ -0,0 +1,407 @@
+"""
+CRM 캠페인 세션 모듈
+채팅으로 입력된 기획전 정보로부터 타겟 고객군, 문자 메시지, 이미지, 타겟 고객 SQL 을 만드는
+전체 흐름을 의존성 그래프로 구성하고, 단계별 결과를 메모이즈합니다.
+
+입력이 바뀌면 그 입력의 하위 단계만 다시 계산되므로,
+예를 들어 문안 수정은 이미지나 타겟 SQL 을 다시 생성하지 않습니다.
+
+    brief ──┬─> segments ──┬─> copy ──> message ──┐
+            │              └─> target_sql ────────┤
+            └─> image_prompts ──> image ──────────┴─> dispatch
+    sample_customer_ids ──> featured_devices ──> copy
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from api.latency import Deadline
+from api.openai_api import OpenAIClient
+from agent.crm_image_generator import CRMImageGenerator, SpeculativeImageCache
+from agent.crm_recommend import CRMRecommendationEngine
+
+_SYSTEM_PROMPT = "당신은 통신사 CRM 캠페인 기획 전문가입니다."
+_LIST_PREFIX = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+class _Node:
+    """그래프의 입력 또는 단계 노드."""
+
+    __slots__ = ("name", "deps", "fn", "value", "version", "dep_versions")
+
+    def __init__(self, name: str, deps: Tuple[str, ...] = (), fn: Optional[Callable[..., Any]] = None):
+        self.name = name
+        self.deps = deps
+        self.fn = fn
+        self.value: Any = None
+        self.version = 0
+        # 마지막 계산 시점의 의존 노드 버전 (None이면 아직 계산되지 않음)
+        self.dep_versions: Optional[Tuple[int, ...]] = None
+
+
+class CampaignWorkflow:
+    """
+    메모이즈된 의존성 그래프.
+
+    각 노드는 버전을 가지며, 단계는 의존 노드의 버전이 마지막 계산 때와 다를 때만 다시 계산됩니다.
+    다시 계산한 결과가 이전과 같으면 버전을 올리지 않아 그 아래 단계의 재계산도 생략됩니다.
+    """
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, _Node] = {}
+        # 단계별 실제 계산 횟수 (캐시 동작 확인용)
+        self.compute_counts: Dict[str, int] = {}
+
+    def add_input(self, name: str, value: Any) -> None:
+        node = _Node(name)
+        node.value = value
+        self._nodes[name] = node
+
+    def add_stage(self, name: str, deps: Sequence[str], fn: Callable[..., Any]) -> None:
+        """
+        단계를 추가합니다.
+
+        Args:
+            name: 단계 이름
+            deps: 의존하는 입력/단계 이름 (fn 의 위치 인자 순서)
+            fn: fn(*dep_values, deadline=...) 형태의 계산 함수
+        """
+        missing = [dep for dep in deps if dep not in self._nodes]
+        if missing:
+            raise ValueError(f"정의되지 않은 의존 노드입니다: {', '.join(missing)}")
+        self._nodes[name] = _Node(name, tuple(deps), fn)
+        self.compute_counts[name] = 0
+
+    def set_input(self, name: str, value: Any) -> None:
+        """입력 값을 바꿉니다. 값이 같으면 하위 단계는 무효화되지 않습니다."""
+        node = self._nodes[name]
+        if node.fn is not None:
+            raise ValueError(f"입력 노드가 아닙니다: {name}")
+        if node.value != value:
+            node.value = value
+            node.version += 1
+
+    def get_input(self, name: str) -> Any:
+        return self._nodes[name].value
+
+    def get(self, name: str, deadline: Optional[Deadline] = None) -> Any:
+        """노드 값을 반환합니다. 필요한 경우에만 상위 단계부터 다시 계산합니다."""
+        return self._evaluate(self._nodes[name], deadline).value
+
+    def _evaluate(self, node: _Node, deadline: Optional[Deadline]) -> _Node:
+        if node.fn is None:
+            return node
+
+        deps = [self._evaluate(self._nodes[dep], deadline) for dep in node.deps]
+        dep_versions = tuple(dep.version for dep in deps)
+        if node.dep_versions == dep_versions:
+            return node
+
+        # 예외가 발생하면 dep_versions 가 갱신되지 않으므로 다음 호출에서 다시 시도됩니다.
+        value = node.fn(*(dep.value for dep in deps), deadline=deadline)
+        self.compute_counts[node.name] += 1
+        if node.dep_versions is None or value != node.value:
+            node.value = value
+            node.version += 1
+        node.dep_versions = dep_versions
+        return node
+
+
+class CampaignSession:
+    """
+    기획전 하나에 대한 CRM 캠페인 세션.
+
+    README 의 채팅 흐름에 대응하는 메서드를 제공합니다.
+        - segments / message / image_prompts: 후보 제안
+        - generate_image: 이미지 생성하기
+        - revise_copy: 문안 수정하기
+        - target_sql: 타겟 고객 추출하기
+        - dispatch: CRM 발송 하기
+    """
+
+    def __init__(
+        self,
+        openai_client: OpenAIClient,
+        image_generator: CRMImageGenerator,
+        recommendation_engine: CRMRecommendationEngine,
+        brief: str = "",
+        speculative_images: Optional[SpeculativeImageCache] = None,
+    ):
+        """
+        Args:
+            openai_client: 텍스트 생성에 사용할 OpenAI 클라이언트
+            image_generator: 이미지 생성기
+            recommendation_engine: 대표 고객 기반 추천 디바이스 조회에 사용할 엔진
+            brief: 기획전 정보
+            speculative_images: 지정하면 이미지 프롬프트 후보가 나오는 즉시 상위 후보의
+                이미지를 미리 생성하고, 이미지 생성 시 그 결과를 사용합니다.
+                세션이 close 될 때 함께 정리됩니다.
+        """
+        self.openai_client = openai_client
+        self.image_generator = image_generator
+        self.recommendation_engine = recommendation_engine
+        self.speculative_images = speculative_images
+        # (원래 문안, 반영된 수정 요청, 수정 결과): 문안 수정을 한 요청씩 누적 반영하는 데 사용합니다.
+        self._revision: Tuple[Optional[str], Tuple[str, ...], str] = (None, (), "")
+
+        workflow = CampaignWorkflow()
+        workflow.add_input("brief", brief)
+        workflow.add_input("sample_customer_ids", ())
+        workflow.add_input("copy_edits", ())
+        workflow.add_input("segment_choice", 0)
+        workflow.add_input("image_choice", 0)
+
+        workflow.add_stage("segments", ["brief"], self._generate_segments)
+        workflow.add_stage("featured_devices", ["sample_customer_ids"], self._collect_featured_devices)
+        workflow.add_stage("copy", ["brief", "segments", "featured_devices"], self._generate_copy)
+        workflow.add_stage("message", ["copy", "copy_edits"], self._apply_copy_edits)
+        workflow.add_stage("image_prompts", ["brief"], self._generate_image_prompts)
+        workflow.add_stage("image", ["image_prompts", "image_choice"], self._generate_image)
+        workflow.add_stage("target_sql", ["segments", "segment_choice"], self._generate_target_sql)
+        workflow.add_stage("dispatch", ["target_sql", "message", "image"], self._assemble_dispatch)
+        self.workflow = workflow
+
+    def close(self) -> None:
+        """세션을 끝냅니다. 선행 생성 중인 이미지 작업을 취소하고 작업 스레드를 정리합니다."""
+        if self.speculative_images is not None:
+            self.speculative_images.shutdown()
+
+    def __enter__(self) -> "CampaignSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 입력 변경
+    # ------------------------------------------------------------------
+    def set_brief(self, brief: str) -> None:
+        """
+        기획전 정보를 바꿉니다. 모든 단계가 다시 계산 대상이 됩니다.
+        새 후보는 개수가 달라질 수 있으므로 문안 수정 요청과 함께 후보 선택도 첫 번째로 되돌립니다.
+        """
+        self.workflow.set_input("brief", brief)
+        self.workflow.set_input("copy_edits", ())
+        self.workflow.set_input("segment_choice", 0)
+        self.workflow.set_input("image_choice", 0)
+
+    def set_sample_customers(self, customer_ids: Sequence[str]) -> None:
+        """문안에 반영할 추천 디바이스를 뽑을 대표 고객을 지정합니다."""
+        self.workflow.set_input("sample_customer_ids", tuple(customer_ids))
+
+    def revise_copy(self, instruction: str) -> str:
+        """
+        문안 수정 요청을 추가하고 수정된 문안을 반환합니다.
+        이미지와 타겟 SQL 은 다시 생성되지 않습니다.
+        """
+        edits = self.workflow.get_input("copy_edits")
+        self.workflow.set_input("copy_edits", edits + (instruction,))
+        return self.message()
+
+    def select_segment(self, index: int) -> None:
+        """
+        발송 대상으로 사용할 타겟 고객군을 선택합니다.
+
+        Raises:
+            ValueError: index 가 현재 타겟 고객군 후보 범위를 벗어난 경우
+        """
+        self._check_choice(index, self.segments(), "타겟 고객군")
+        self.workflow.set_input("segment_choice", index)
+
+    def select_image_prompt(self, index: int) -> None:
+        """
+        이미지 생성에 사용할 프롬프트 후보를 선택합니다.
+
+        Raises:
+            ValueError: index 가 현재 이미지 프롬프트 후보 범위를 벗어난 경우
+        """
+        self._check_choice(index, self.image_prompts(), "이미지 프롬프트")
+        self.workflow.set_input("image_choice", index)
+
+    @staticmethod
+    def _check_choice(index: int, candidates: Sequence[str], what: str) -> None:
+        if not 0 <= index < len(candidates):
+            raise ValueError(f"{what} 후보 번호가 범위를 벗어났습니다: {index} (후보 {len(candidates)}개)")
+
+    # ------------------------------------------------------------------
+    # 단계 결과
+    # ------------------------------------------------------------------
+    def segments(self, deadline: Optional[Deadline] = None) -> List[str]:
+        """타겟 고객군 후보 5개를 반환합니다."""
+        return self.workflow.get("segments", deadline)
+
+    def message(self, deadline: Optional[Deadline] = None) -> str:
+        """수정 요청이 반영된 문자 메시지 문안을 반환합니다."""
+        return self.workflow.get("message", deadline)
+
+    def image_prompts(self, deadline: Optional[Deadline] = None) -> List[str]:
+        """우선순위 순으로 정렬된 이미지 프롬프트 후보를 반환합니다."""
+        return self.workflow.get("image_prompts", deadline)
+
+    def generate_image(self, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        선택된 프롬프트로 생성한 이미지를 반환합니다.
+
+        Raises:
+            ValueError: 선택된 번호가 현재 이미지 프롬프트 후보 범위를 벗어난 경우
+        """
+        return self.workflow.get("image", deadline)
+
+    def target_sql(self, deadline: Optional[Deadline] = None) -> str:
+        """
+        선택된 타겟 고객군을 추출하는 SQL 을 반환합니다.
+
+        Raises:
+            ValueError: 선택된 번호가 현재 타겟 고객군 후보 범위를 벗어난 경우
+        """
+        return self.workflow.get("target_sql", deadline)
+
+    def dispatch(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """발송에 필요한 타겟 고객 SQL, 문자 메시지, 이미지를 정리해 반환합니다."""
+        return self.workflow.get("dispatch", deadline)
+
+    # ------------------------------------------------------------------
+    # 단계 구현
+    # ------------------------------------------------------------------
+    def _complete(self, prompt: str, what: str, deadline: Optional[Deadline], max_tokens: int = 1000) -> str:
+        text = self.openai_client.complete(_SYSTEM_PROMPT, prompt, max_tokens=max_tokens, deadline=deadline)
+        if not text:
+            raise RuntimeError(f"{what}을(를) 생성하지 못했습니다.")
+        return text.strip()
+
+    @staticmethod
+    def _parse_list(text: str, limit: int) -> List[str]:
+        """번호/글머리표 목록 응답을 항목 리스트로 변환합니다."""
+        items = [_LIST_PREFIX.sub("", line).strip() for line in text.splitlines()]
+        return [item for item in items if item][:limit]
+
+    def _generate_segments(self, brief: str, *, deadline: Optional[Deadline]) -> List[str]:
+        prompt = f"""
+        다음 기획전에 CRM 문자를 보낼 타겟 고객군 5개를 제안해주세요.
+        각 고객군은 한 줄에 하나씩, 고객군 이름과 선정 기준을 함께 적어주세요.
+
+        기획전 정보:
+        {brief}
+        """
+        return self._parse_list(self._complete(prompt, "타겟 고객군", deadline), 5)
+
+    def _collect_featured_devices(
+        self,
+        customer_ids: Tuple[str, ...],
+        *,
+        deadline: Optional[Deadline],
+    ) -> List[str]:
+        devices: List[str] = []
+        for customer_id in customer_ids:
+            result = self.recommendation_engine.recommend_devices_for_customer(customer_id, deadline=deadline)
+            if not result:
+                continue
+            for item in result["recommendations"]:
+                name = item.get("device_name")
+                if name and name not in devices:
+                    devices.append(name)
+        return devices
+
+    def _generate_copy(
+        self,
+        brief: str,
+        segments: List[str],
+        featured_devices: List[str],
+        *,
+        deadline: Optional[Deadline],
+    ) -> str:
+        segment_lines = "\n".join(f"- {segment}" for segment in segments)
+        device_line = ", ".join(featured_devices) if featured_devices else "없음"
+        prompt = f"""
+        다음 기획전의 CRM 문자 메시지 문안을 작성해주세요.
+
+        기획전 정보:
+        {brief}
+
+        타겟 고객군:
+        {segment_lines}
+
+        추천 디바이스: {device_line}
+        """
+        return self._complete(prompt, "문자 메시지 문안", deadline)
+
+    def _apply_copy_edits(self, copy: str, edits: Tuple[str, ...], *, deadline: Optional[Deadline]) -> str:
+        # 이미 반영된 수정 요청은 다시 보내지 않고, 직전 수정 결과에 새 요청만 반영합니다.
+        # 원래 문안이 바뀐 경우에만 처음부터 순서대로 다시 반영합니다.
+        base_copy, applied, text = self._revision
+        if base_copy != copy or edits[:len(applied)] != applied:
+            applied, text = (), copy
+            self._revision = (copy, applied, text)
+
+        for instruction in edits[len(applied):]:
+            text = self._revise(text, instruction, deadline)
+            applied += (instruction,)
+            self._revision = (copy, applied, text)
+        return text
+
+    def _revise(self, text: str, instruction: str, deadline: Optional[Deadline]) -> str:
+        prompt = f"""
+        다음 CRM 문자 메시지 문안을 수정 요청에 맞게 고쳐주세요.
+        요청과 관계없는 부분은 그대로 두고, 수정된 문안만 출력해주세요.
+
+        현재 문안:
+        {text}
+
+        수정 요청:
+        {instruction}
+        """
+        return self._complete(prompt, "수정된 문안", deadline)
+
+    def _generate_image_prompts(self, brief: str, *, deadline: Optional[Deadline]) -> List[str]:
+        prompt = f"""
+        다음 기획전의 CRM 이미지를 만들기 위한 영어 이미지 생성 프롬프트 후보 3개를
+        추천 순서대로 한 줄에 하나씩 작성해주세요.
+
+        기획전 정보:
+        {brief}
+        """
+        prompts = self._parse_list(self._complete(prompt, "이미지 프롬프트", deadline), 3)
+        if not prompts:
+            raise RuntimeError("이미지 프롬프트를 생성하지 못했습니다.")
+        if self.speculative_images is not None:
+            self.speculative_images.propose(prompts)
+        return prompts
+
+    def _generate_image(
+        self,
+        prompts: List[str],
+        choice: int,
+        *,
+        deadline: Optional[Deadline],
+    ) -> List[Dict[str, Any]]:
+        # 선택 이후 후보가 다시 생성되어 개수가 줄었을 수 있으므로 계산 시점에도 확인합니다.
+        self._check_choice(choice, prompts, "이미지 프롬프트")
+        if self.speculative_images is not None:
+            return self.speculative_images.get(prompts[choice], deadline=deadline)
+        return self.image_generator.generate(prompts[choice], deadline=deadline)
+
+    def _generate_target_sql(self, segments: List[str], choice: int, *, deadline: Optional[Deadline]) -> str:
+        self._check_choice(choice, segments, "타겟 고객군")
+        prompt = f"""
+        다음 타겟 고객군을 추출하는 SQL 문을 작성해주세요. SQL 문만 출력해주세요.
+
+        타겟 고객군:
+        {segments[choice]}
+        """
+        return self._complete(prompt, "타겟 고객 SQL", deadline)
+
+    @staticmethod
+    def _assemble_dispatch(
+        target_sql: str,
+        message: str,
+        image: List[Dict[str, Any]],
+        *,
+        deadline: Optional[Deadline],
+    ) -> Dict[str, Any]:
+        return {
+            "target_sql": target_sql,
+            "message": message,
+            "image": image,
+        }
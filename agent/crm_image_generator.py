@@ -7,10 +7,15 @@ from __future__ import annotations
 
 import base64
 import json
+import threading
+import time
 import tkinter as tk
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Sequence
 
 from config import Config
+from api.latency import Deadline, DeadlineExceeded
 from api.openrouter_api import OpenRouterClient
 
 
@@ -28,6 +33,7 @@ class CRMImageGenerator:
         model: Optional[str] = None,
         modalities: Optional[List[str]] = None,
         extra_options: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
     ) -> List[Dict[str, Any]]:
         """
         OpenRouter Chat Completions 엔드포인트를 사용해 이미지를 생성합니다.
@@ -37,6 +43,7 @@ class CRMImageGenerator:
             model: 사용할 모델명 (기본값은 설정의 이미지 모델)
             modalities: 사용할 모달리티 목록 (기본값 ["image"])
             extra_options: OpenRouter API에서 요구하는 추가 파라미터
+            deadline: 전체 호출의 마감 시간
 
         Returns:
             이미지 관련 정보를 담은 딕셔너리 리스트
@@ -55,7 +62,7 @@ class CRMImageGenerator:
         if extra_options:
             payload.update(extra_options)
 
-        response = self.client.create_chat_completion(payload)
+        response = self.client.create_chat_completion(payload, deadline=deadline)
 
         if "choices" not in response or not response["choices"]:
             raw = response.get("raw")
@@ -104,3 +111,143 @@ class CRMImageGenerator:
         label.pack()
 
         root.mainloop()
+
+
+class _SpeculativeEntry:
+    """선행 생성 중이거나 완료된 이미지 작업."""
+
+    __slots__ = ("future", "created_at")
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.created_at = time.monotonic()
+
+
+class SpeculativeImageCache:
+    """
+    이미지 프롬프트 후보가 제안되는 즉시 상위 후보의 이미지를 백그라운드에서 미리 생성합니다.
+
+    사용자가 "이미지 생성하기"를 누르면 get 이 진행 중이거나 완료된 결과를 가져가 사용하고,
+    선행 생성되지 않은 프롬프트만 새로 생성합니다. 가져간 결과는 캐시에서 바로 제거되며,
+    사용되지 않은 작업은 새 후보가 제안되거나 ttl 이 지나면 취소/만료됩니다.
+
+    spent 는 선행 생성에 쓴 비용 중 아직 사용되지 않았거나 버려진 비용의 누적값이며,
+    budget 을 넘으면 더 이상 선행 생성을 시작하지 않습니다. get 으로 사용된 작업과 시작 전에
+    취소된 작업의 비용은 spent 에서 돌려받습니다. budget_window 를 지정하면 그 주기마다
+    spent 를 0 으로 되돌려, 긴 세션에서도 기간당 낭비 비용만 제한합니다.
+
+    이미 OpenRouter 로 전송된 요청은 중단할 수 없으므로, 취소 시 아직 시작되지 않은 작업만
+    실제로 취소됩니다. 실행 중인 요청은 OpenRouter 요청 타임아웃 안에 끝나며, 사용이 끝나면
+    shutdown 을 호출해 대기 중인 작업을 정리해야 합니다.
+    """
+
+    def __init__(
+        self,
+        generator: CRMImageGenerator,
+        *,
+        top_k: int = 1,
+        budget: float = 3.0,
+        cost_per_image: float = 1.0,
+        ttl: float = 600.0,
+        max_workers: int = 2,
+        budget_window: Optional[float] = None,
+    ):
+        """
+        Args:
+            generator: 실제 이미지 생성에 사용할 생성기
+            top_k: 제안된 후보 중 선행 생성할 상위 개수
+            budget: 사용되지 않은 선행 생성에 쓸 수 있는 최대 누적 비용
+            cost_per_image: 이미지 한 장 생성 비용 (budget 과 같은 단위)
+            ttl: 사용되지 않은 선행 생성 결과를 보관하는 시간 (초)
+            max_workers: 동시에 실행할 선행 생성 작업 수
+            budget_window: 지정하면 이 주기(초)마다 누적 비용을 초기화합니다 (None이면 캐시 수명 전체)
+        """
+        self.generator = generator
+        self.top_k = top_k
+        self.budget = budget
+        self.cost_per_image = cost_per_image
+        self.ttl = ttl
+        self.budget_window = budget_window
+        self.spent = 0.0
+        self._window_started = time.monotonic()
+        self._entries: Dict[str, _SpeculativeEntry] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-speculation")
+
+    def propose(self, prompts: Sequence[str]) -> None:
+        """
+        우선순위 순으로 정렬된 프롬프트 후보를 받아 상위 후보의 선행 생성을 시작합니다.
+        이번 후보에 없는 이전 작업은 취소하며, 예산이 부족하면 남은 후보는 선행 생성하지 않습니다.
+        """
+        candidates = list(prompts[:self.top_k])
+        with self._lock:
+            self._expire_locked()
+            for prompt in [prompt for prompt in self._entries if prompt not in prompts]:
+                self._discard_locked(prompt)
+
+            self._reset_window_locked()
+            for prompt in candidates:
+                if prompt in self._entries:
+                    continue
+                if self.spent + self.cost_per_image > self.budget:
+                    break
+                self.spent += self.cost_per_image
+                self._entries[prompt] = _SpeculativeEntry(self._executor.submit(self.generator.generate, prompt))
+
+    def get(self, prompt: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        프롬프트의 이미지를 반환합니다. 선행 생성된 작업이 있으면 캐시에서 꺼내 그 결과를 기다려 사용하고,
+        없거나 실패한 경우 새로 생성합니다.
+        """
+        with self._lock:
+            self._expire_locked()
+            entry = self._entries.pop(prompt, None)
+            if entry is not None:
+                # 사용된 작업은 낭비가 아니므로 예산을 돌려받습니다.
+                self.spent -= self.cost_per_image
+
+        if entry is not None:
+            timeout = deadline.timeout() if deadline is not None else None
+            try:
+                return entry.future.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise DeadlineExceeded("요청 마감 시간이 지났습니다.") from None
+            except Exception as exc:
+                print(f"선행 생성된 이미지를 사용할 수 없어 다시 생성합니다: {exc}")
+
+        return self.generator.generate(prompt, deadline=deadline)
+
+    def cancel_unused(self) -> None:
+        """사용되지 않은 선행 생성 작업을 모두 취소합니다."""
+        with self._lock:
+            for prompt in list(self._entries):
+                self._discard_locked(prompt)
+
+    def shutdown(self) -> None:
+        """사용되지 않은 작업을 취소하고 작업 스레드를 정리합니다."""
+        self.cancel_unused()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _reset_window_locked(self) -> None:
+        """
+        budget_window 가 지났으면 버려진 비용을 초기화합니다. 호출 측에서 잠금을 보유해야 합니다.
+        아직 남아 있는 작업은 나중에 사용/취소될 때 돌려받으므로 그 비용은 유지합니다.
+        """
+        if self.budget_window is None:
+            return
+        now = time.monotonic()
+        if now - self._window_started >= self.budget_window:
+            self.spent = len(self._entries) * self.cost_per_image
+            self._window_started = now
+
+    def _expire_locked(self) -> None:
+        """ttl 이 지난 미사용 작업을 제거합니다. 호출 측에서 잠금을 보유해야 합니다."""
+        now = time.monotonic()
+        for prompt in [prompt for prompt, entry in self._entries.items() if now - entry.created_at > self.ttl]:
+            self._discard_locked(prompt)
+
+    def _discard_locked(self, prompt: str) -> None:
+        """작업을 제거하고, 아직 시작되지 않았다면 취소해 예산을 돌려받습니다."""
+        entry = self._entries.pop(prompt)
+        if entry.future.cancel():
+            self.spent -= self.cost_per_image
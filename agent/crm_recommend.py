@@ -2,9 +2,14 @@
 CRM 추천 모듈
 CRM 데이터를 기반으로 디바이스 추천 로직을 처리합니다.
 """
-from typing import Dict, Any, List, Optional
+import os
+from typing import Dict, Any, Iterable, List, Optional
+from api.latency import Deadline
 from api.openai_api import OpenAIClient
+from api.openai_batch import BatchJob, OpenAIBatchClient
 from api.qlik_api import QlikClient
+from api.qlik_records import CustomerSegment, DeviceCatalog, FeatureVocabulary, count_matches
+from agent.recommendation_store import RecommendationStore
 
 class CRMRecommendationEngine:
     """CRM 기반 디바이스 추천 엔진"""
@@ -16,48 +21,244 @@ class CRMRecommendationEngine:
     
     def recommend_devices_for_customer(
         self, 
-        customer_id: str
+        customer_id: str,
+        deadline: Optional[Deadline] = None
     ) -> Optional[Dict[str, Any]]:
         """
         고객에게 적합한 디바이스를 추천합니다.
         
         Args:
             customer_id: 고객 ID
+            deadline: 전체 호출의 마감 시간. 모든 Qlik/OpenAI 요청의 타임아웃이 남은 예산에서 계산됩니다.
         
         Returns:
             추천 결과 딕셔너리 또는 None
+        
+        Raises:
+            DeadlineExceeded: 처리 도중 마감 시간이 지난 경우
         """
         # 고객 데이터 가져오기
-        customer_data = self.qlik_client.get_customer_data(customer_id)
-        if not customer_data:
+        customer = self.qlik_client.get_customer_record(customer_id, deadline=deadline)
+        if customer is None:
             print(f"고객 데이터를 가져올 수 없습니다: {customer_id}")
             return None
         
         # 디바이스 데이터 가져오기
-        device_list = self.qlik_client.get_device_data()
-        if not device_list:
+        catalog = self.qlik_client.get_device_catalog(deadline=deadline)
+        if not len(catalog):
             print("디바이스 데이터를 가져올 수 없습니다.")
             return None
         
         # 각 디바이스에 대해 추천 생성
+        customer_data = customer.to_dict()
+        preference_set = customer.preference_set()
         recommendations = []
-        for device in device_list:
+        for index, device in enumerate(catalog):
             recommendation = self.openai_client.generate_recommendation(
-                device_data=device,
-                customer_context=customer_data
+                device_data=device.to_dict(),
+                customer_context=customer_data,
+                deadline=deadline
             )
             
             if recommendation:
-                recommendations.append({
-                    "device_id": device.get("id"),
-                    "device_name": device.get("name"),
-                    "recommendation": recommendation,
-                    "score": self._calculate_recommendation_score(device, customer_data)
-                })
-        
-        # 점수 기준으로 정렬
-        recommendations.sort(key=lambda x: x["score"], reverse=True)
+                recommendations.append(self._build_entry(catalog, index, preference_set, recommendation))
+        
+        return self._top_recommendations(customer_id, recommendations)
+    
+    def recommend_devices_for_segment_offline(
+        self,
+        customer_ids: List[str],
+        batch_client: OpenAIBatchClient,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+        job_path: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        고객 세그먼트 전체의 디바이스 추천을 Batch API 로 한 번에 생성합니다.
+        대화형 호출의 요청 한도를 쓰지 않으므로 야간 일괄 처리에 사용합니다.
+        ID가 없는 디바이스는 배치 결과를 구분할 수 없으므로 추천 대상에서 제외됩니다.
         
+        Args:
+            customer_ids: 고객 ID 목록
+            batch_client: 배치 제출에 사용할 클라이언트
+            poll_interval: 배치 상태 조회 간격 (초)
+            timeout: 최대 대기 시간 (초)
+            job_path: 제출한 배치 작업을 기록할 파일 경로. 파일이 이미 있으면 새로 제출하지 않고
+                기록된 작업의 완료를 기다리므로, 프로세스가 재시작되어도 결과를 이어서 받을 수 있습니다.
+                결과를 받은 뒤 파일은 삭제됩니다.
+        
+        Returns:
+            고객 ID → recommend_devices_for_customer 와 같은 형식의 추천 결과
+        """
+        catalog = self.qlik_client.get_device_catalog()
+        if not len(catalog):
+            print("디바이스 데이터를 가져올 수 없습니다.")
+            return {}
+        
+        # 세그먼트 전체를 결과가 나올 때까지 보관하므로 열 단위 컨테이너에 담습니다.
+        # 고객 응답의 ID는 요청한 ID와 형식이 다를 수 있어(정수 등) 요청 ID를 따로 보관합니다.
+        customers = CustomerSegment(self.qlik_client.vocabulary)
+        requested_ids: List[str] = []
+        for customer_id in customer_ids:
+            customer = self.qlik_client.get_customer_record(customer_id)
+            if customer is None:
+                print(f"고객 데이터를 가져올 수 없습니다: {customer_id}")
+                continue
+            customers.append(customer)
+            requested_ids.append(customer_id)
+        
+        if not requested_ids:
+            return {}
+        
+        tracked = [index for index, device_id in enumerate(catalog.ids) if device_id is not None]
+        if len(tracked) < len(catalog):
+            print(f"ID가 없는 디바이스 {len(catalog) - len(tracked)}개는 배치 추천에서 제외됩니다.")
+        if not tracked:
+            return {}
+        
+        if job_path and os.path.exists(job_path):
+            job = BatchJob.load(job_path)
+            print(f"기록된 배치 작업의 결과를 이어서 기다립니다: {', '.join(job.batch_ids)}")
+        else:
+            # 프롬프트용 딕셔너리는 디바이스마다 한 번만 복원합니다.
+            device_dicts = [catalog[index].to_dict() for index in tracked]
+            job = batch_client.submit_recommendations(
+                (customer_id, customer.to_dict(), device_data)
+                for customer_id, customer in zip(requested_ids, customers)
+                for device_data in device_dicts
+            )
+            if job_path:
+                job.save(job_path)
+        texts = batch_client.wait(job, poll_interval=poll_interval, timeout=timeout)
+        if job_path:
+            os.remove(job_path)
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        for position, customer_id in enumerate(requested_ids):
+            preference_set = customers.preference_set(position)
+            recommendations = []
+            for index in tracked:
+                recommendation = texts.get((customer_id, catalog.ids[index]))
+                if recommendation:
+                    recommendations.append(self._build_entry(catalog, index, preference_set, recommendation))
+            
+            results[customer_id] = self._top_recommendations(customer_id, recommendations)
+        
+        return results
+    
+    def refresh_recommendations(
+        self,
+        customer_ids: List[str],
+        store: RecommendationStore,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        저장된 추천 결과를 현재 Qlik 데이터에 맞게 갱신합니다.
+        
+        고객/디바이스 입력의 해시를 저장된 해시와 비교해 바뀌었거나 새로 생긴
+        (고객, 디바이스) 쌍만 OpenAI 로 다시 계산하고, 나머지는 저장된 결과를 재사용합니다.
+        카탈로그에서 사라진 디바이스의 결과는 삭제됩니다.
+        
+        Args:
+            customer_ids: 갱신할 고객 ID 목록
+            store: 이전 실행 결과가 담긴 저장소 (갱신 후 저장됩니다)
+            deadline: 전체 호출의 마감 시간
+        
+        Returns:
+            고객 ID → recommend_devices_for_customer 와 같은 형식의 추천 결과
+        """
+        catalog = self.qlik_client.get_device_catalog(deadline=deadline)
+        if not len(catalog):
+            print("디바이스 데이터를 가져올 수 없습니다.")
+            return {}
+        
+        # ID가 없는 디바이스는 저장된 결과와 대응시킬 수 없으므로 갱신 대상에서 제외합니다.
+        tracked = [index for index, device_id in enumerate(catalog.ids) if device_id is not None]
+        if len(tracked) < len(catalog):
+            print(f"ID가 없는 디바이스 {len(catalog) - len(tracked)}개는 추천 갱신에서 제외됩니다.")
+        
+        # 디바이스 해시는 고객 수와 무관하게 디바이스마다 한 번만 계산합니다.
+        device_keys = {index: str(catalog.ids[index]) for index in tracked}
+        device_hashes = {index: catalog[index].content_hash() for index in tracked}
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            for customer_id in customer_ids:
+                customer = self.qlik_client.get_customer_record(customer_id, deadline=deadline)
+                if customer is None:
+                    print(f"고객 데이터를 가져올 수 없습니다: {customer_id}")
+                    continue
+                
+                store.set_customer_hash(customer_id, customer.content_hash())
+                entries = store.get_entries(customer_id)
+                
+                for stale_key in set(entries) - set(device_keys.values()):
+                    store.remove(customer_id, stale_key)
+                
+                customer_data: Optional[Dict[str, Any]] = None
+                preference_set = customer.preference_set()
+                for index in tracked:
+                    entry = entries.get(device_keys[index])
+                    if entry and entry["device_hash"] == device_hashes[index]:
+                        continue
+                    
+                    if customer_data is None:
+                        customer_data = customer.to_dict()
+                    recommendation = self.openai_client.generate_recommendation(
+                        device_data=catalog[index].to_dict(),
+                        customer_context=customer_data,
+                        deadline=deadline
+                    )
+                    if not recommendation:
+                        # 실패한 쌍은 저장하지 않아 다음 갱신에서 다시 시도됩니다.
+                        store.remove(customer_id, device_keys[index])
+                        continue
+                    
+                    store.put(
+                        customer_id,
+                        device_keys[index],
+                        device_hashes[index],
+                        catalog.names[index],
+                        recommendation,
+                        self._calculate_recommendation_score(catalog.feature_codes(index), preference_set, catalog.vocabulary)
+                    )
+                
+                recommendations = [
+                    {
+                        "device_id": catalog.ids[index],
+                        "device_name": entries[key]["device_name"],
+                        "recommendation": entries[key]["recommendation"],
+                        "score": entries[key]["score"]
+                    }
+                    for index, key in device_keys.items()
+                    if key in entries
+                ]
+                results[customer_id] = self._top_recommendations(customer_id, recommendations)
+        finally:
+            # 마감 시간 초과 등으로 중단되어도 이미 계산한 결과는 보존합니다.
+            store.save()
+        
+        return results
+    
+    def _build_entry(
+        self,
+        catalog: DeviceCatalog,
+        index: int,
+        preference_set: frozenset,
+        recommendation: str
+    ) -> Dict[str, Any]:
+        """카탈로그의 index 번째 디바이스에 대한 추천 항목을 만듭니다."""
+        return {
+            "device_id": catalog.ids[index],
+            "device_name": catalog.names[index],
+            "recommendation": recommendation,
+            "score": self._calculate_recommendation_score(catalog.feature_codes(index), preference_set, catalog.vocabulary)
+        }
+    
+    @staticmethod
+    def _top_recommendations(customer_id: str, recommendations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """점수 기준으로 정렬해 상위 5개 추천만 남깁니다."""
+        recommendations.sort(key=lambda x: x["score"], reverse=True)
         return {
             "customer_id": customer_id,
             "recommendations": recommendations[:5]  # 상위 5개만 반환
@@ -65,15 +266,17 @@ class CRMRecommendationEngine:
     
     def _calculate_recommendation_score(
         self, 
-        device: Dict[str, Any], 
-        customer: Dict[str, Any]
+        feature_codes: Iterable[int], 
+        preference_set: frozenset,
+        vocabulary: FeatureVocabulary
     ) -> float:
         """
         디바이스와 고객 정보를 기반으로 추천 점수를 계산합니다.
         
         Args:
-            device: 디바이스 정보
-            customer: 고객 정보
+            feature_codes: 디바이스 특성 코드
+            preference_set: 고객 선호 비교용 코드 집합
+            vocabulary: 코드를 만든 사전
         
         Returns:
             추천 점수 (0.0 ~ 1.0)
@@ -81,15 +284,9 @@ class CRMRecommendationEngine:
         # 간단한 점수 계산 로직 (실제로는 더 복잡한 알고리즘 사용 가능)
         score = 0.5  # 기본 점수
         
-        # 고객 선호도와 디바이스 특성 매칭
-        customer_preferences = customer.get("preferences", {})
-        device_features = device.get("features", {})
-        
         # 매칭되는 특성 수에 따라 점수 증가
-        matching_features = sum(
-            1 for key in customer_preferences 
-            if key in device_features and customer_preferences[key] == device_features[key]
-        )
+        # (키와 값이 == 로 같은 항목은 같은 비교용 코드를 가지므로 정수 비교만 수행합니다)
+        matching_features = count_matches(preference_set, feature_codes, vocabulary)
         
         score += min(matching_features * 0.1, 0.5)  # 최대 0.5까지 추가
         
@@ -0,0 +1,97 @@
+"""
+추천 결과 저장소 모듈
+고객별 추천 결과와, 그 결과를 만들 때 사용한 고객/디바이스 입력의 해시를 보관합니다.
+캠페인을 다시 실행할 때 바뀐 (고객, 디바이스) 쌍만 다시 계산하는 데 사용됩니다.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+class RecommendationStore:
+    """
+    JSON 파일 기반 추천 결과 저장소.
+
+    저장 형식:
+        {
+            "customers": {
+                "<customer_id>": {
+                    "customer_hash": "...",
+                    "devices": {
+                        "<device_id>": {
+                            "device_hash": "...",
+                            "device_name": "...",
+                            "recommendation": "...",
+                            "score": 0.5
+                        }
+                    }
+                }
+            }
+        }
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 저장 파일 경로 (None이면 메모리에만 보관)
+        """
+        self.path = path
+        self._customers: Dict[str, Dict[str, Any]] = {}
+
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fp:
+                self._customers = json.load(fp).get("customers", {})
+
+    def get_customer_hash(self, customer_id: str) -> Optional[str]:
+        """저장된 고객 입력 해시를 반환합니다."""
+        entry = self._customers.get(customer_id)
+        return entry.get("customer_hash") if entry else None
+
+    def get_entries(self, customer_id: str) -> Dict[str, Dict[str, Any]]:
+        """고객의 디바이스 ID → 저장된 추천 항목을 반환합니다."""
+        entry = self._customers.get(customer_id)
+        return entry["devices"] if entry else {}
+
+    def set_customer_hash(self, customer_id: str, customer_hash: str) -> None:
+        """
+        고객 입력 해시를 기록합니다.
+        해시가 바뀌면 기존 디바이스 항목은 모두 무효이므로 함께 비웁니다.
+        """
+        entry = self._customers.setdefault(customer_id, {"customer_hash": customer_hash, "devices": {}})
+        if entry["customer_hash"] != customer_hash:
+            entry["customer_hash"] = customer_hash
+            entry["devices"] = {}
+
+    def put(
+        self,
+        customer_id: str,
+        device_id: str,
+        device_hash: str,
+        device_name: Optional[str],
+        recommendation: str,
+        score: float,
+    ) -> None:
+        """(고객, 디바이스) 쌍의 추천 결과를 기록합니다. set_customer_hash 가 먼저 호출되어야 합니다."""
+        self._customers[customer_id]["devices"][device_id] = {
+            "device_hash": device_hash,
+            "device_name": device_name,
+            "recommendation": recommendation,
+            "score": score,
+        }
+
+    def remove(self, customer_id: str, device_id: str) -> None:
+        """(고객, 디바이스) 쌍의 추천 결과를 삭제합니다."""
+        self.get_entries(customer_id).pop(device_id, None)
+
+    def save(self) -> None:
+        """저장소를 파일에 기록합니다. 쓰는 도중 중단되어도 기존 파일이 깨지지 않도록 교체 방식으로 저장합니다."""
+        if not self.path:
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump({"customers": self._customers}, fp, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
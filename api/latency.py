@@ -0,0 +1,148 @@
+"""
+지연 시간 제어 모듈
+최상위 호출에서 하위 API 호출까지 전달되는 마감 시간(Deadline)과,
+멱등 조회 요청의 꼬리 지연을 줄이기 위한 헤지(hedged) 요청 기능을 제공합니다.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Callable, Deque, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """남은 시간 예산이 없어 요청을 보낼 수 없을 때 발생합니다."""
+
+
+class Deadline:
+    """최상위 호출 기준의 절대 마감 시각."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: float):
+        """
+        Args:
+            expires_at: time.monotonic() 기준 마감 시각
+        """
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """지금부터 seconds 초 뒤에 만료되는 마감 시간을 만듭니다."""
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """남은 시간(초)을 반환합니다. 만료되었으면 0 이하입니다."""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        남은 예산으로 개별 요청의 타임아웃을 계산합니다.
+
+        Args:
+            cap: 요청별 최대 타임아웃 (예: 클라이언트 기본값)
+
+        Raises:
+            DeadlineExceeded: 이미 마감 시간이 지난 경우
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("요청 마감 시간이 지났습니다.")
+        return remaining if cap is None else min(remaining, cap)
+
+
+def resolve_timeout(deadline: Optional[Deadline], default: float) -> float:
+    """마감 시간이 있으면 남은 예산과 기본 타임아웃 중 작은 값을, 없으면 기본값을 반환합니다."""
+    return default if deadline is None else deadline.timeout(cap=default)
+
+
+class LatencyTracker:
+    """최근 요청 지연 시간을 보관하고 백분위수를 계산합니다. 여러 스레드에서 안전하게 사용할 수 있습니다."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Args:
+            window: 보관할 최근 표본 수
+            min_samples: 백분위수를 신뢰할 수 있는 최소 표본 수
+        """
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        최근 지연 시간의 백분위수를 반환합니다.
+
+        Returns:
+            백분위수 (초), 표본이 min_samples 보다 적으면 None
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(int(fraction * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+
+def hedged_call(
+    fn: Callable[[], T],
+    executor: Executor,
+    hedge_after: Optional[float],
+    deadline: Optional[Deadline] = None,
+) -> T:
+    """
+    fn 을 실행하고, hedge_after 초가 지나도 첫 요청이 아직 실행 중이면 같은 요청을 한 번 더 보내
+    먼저 성공한 결과를 반환합니다. 첫 요청이 그 전에 실패하면 다시 보내지 않고 예외를 그대로 전달합니다.
+    멱등한 조회 요청에만 사용해야 합니다.
+
+    늦게 끝난 쪽의 요청은 취소할 수 없으므로 백그라운드에서 완료된 뒤 버려집니다.
+
+    Args:
+        fn: 실행할 요청 함수
+        executor: 요청을 실행할 스레드 풀
+        hedge_after: 두 번째 요청을 보낼 때까지 기다릴 시간 (None이면 헤지하지 않음)
+        deadline: 전체 마감 시간
+
+    Raises:
+        DeadlineExceeded: 마감 시간 안에 어떤 요청도 끝나지 않은 경우
+        Exception: 첫 요청이 hedge_after 전에 실패한 경우 그 예외, 두 요청이 모두 실패한 경우 마지막 예외
+    """
+    if hedge_after is None:
+        return fn()
+
+    first = executor.submit(fn)
+    wait_for = hedge_after if deadline is None else min(hedge_after, max(deadline.remaining(), 0))
+    done, _ = wait([first], timeout=wait_for)
+    if first in done:
+        # 빨리 실패한 요청(예: 404)은 재시도하지 않고 그대로 예외를 전달합니다.
+        return first.result()
+
+    pending: Set[Future] = {first}
+    if deadline is None or not deadline.expired():
+        pending.add(executor.submit(fn))
+
+    last_exc: Optional[BaseException] = None
+    while pending:
+        timeout = None if deadline is None else max(deadline.remaining(), 0)
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded("요청 마감 시간이 지났습니다.")
+        for future in done:
+            exc = future.exception()
+            if exc is None:
+                return future.result()
+            last_exc = exc
+
+    raise last_exc
@@ -5,6 +5,18 @@ OpenAI API를 호출하고 응답을 처리합니다.
 import openai
 from typing import Dict, Any, Optional
 from config import Config, OPENAI_API_KEY
+from api.latency import Deadline
+
+
+def _with_budget(client: openai.OpenAI, budget: Optional[float]) -> openai.OpenAI:
+    """
+    마감 시간이 있으면 남은 예산을 타임아웃으로 쓰고 재시도를 끈 클라이언트를 반환합니다.
+    SDK 기본 재시도(타임아웃/429/5xx 시 최대 2회 + 백오프)는 남은 예산을 몇 배로 넘길 수 있습니다.
+    """
+    if budget is None:
+        return client
+    return client.with_options(max_retries=0, timeout=budget)
+
 
 class OpenAIClient:
     """OpenAI API 클라이언트"""
@@ -13,12 +25,14 @@ class OpenAIClient:
         """OpenAI 클라이언트를 초기화합니다."""
         self.config = config
         openai.api_key = config.openai_api_key
+        self.client = openai.OpenAI(api_key=config.openai_api_key)
         self.model = config.openai_model
     
     def generate_recommendation(
         self, 
         device_data: Dict[str, Any], 
-        customer_context: Dict[str, Any]
+        customer_context: Dict[str, Any],
+        deadline: Optional[Deadline] = None
     ) -> Optional[str]:
         """
         디바이스 추천을 위한 프롬프트를 생성하고 OpenAI API를 호출합니다.
@@ -26,22 +40,63 @@ class OpenAIClient:
         Args:
             device_data: 디바이스 정보 딕셔너리
             customer_context: 고객 컨텍스트 정보 딕셔너리
+            deadline: 전체 호출의 마감 시간 (선택사항)
         
         Returns:
             OpenAI API 응답 텍스트 또는 None
+        
+        Raises:
+            DeadlineExceeded: 호출 전에 마감 시간이 이미 지난 경우
         """
+        request = self.build_recommendation_request(device_data, customer_context)
+        budget = deadline.timeout() if deadline is not None else None
+        
         try:
-            prompt = self._build_prompt(device_data, customer_context)
+            response = _with_budget(self.client, budget).chat.completions.create(**request)
             
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "당신은 CRM 기반 디바이스 마케팅 전문가입니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+            return response.choices[0].message.content
+            
+        except Exception as e:
+            print(f"OpenAI API 호출 오류: {str(e)}")
+            return None
+    
+    def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[str]:
+        """
+        시스템/사용자 프롬프트로 OpenAI API를 호출합니다.
+        
+        Args:
+            system_prompt: 시스템 역할 프롬프트
+            user_prompt: 사용자 프롬프트
+            temperature: 샘플링 온도
+            max_tokens: 최대 응답 토큰 수
+            deadline: 전체 호출의 마감 시간 (선택사항)
+        
+        Returns:
+            OpenAI API 응답 텍스트 또는 None
+        
+        Raises:
+            DeadlineExceeded: 호출 전에 마감 시간이 이미 지난 경우
+        """
+        request: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        budget = deadline.timeout() if deadline is not None else None
+        
+        try:
+            response = _with_budget(self.client, budget).chat.completions.create(**request)
             
             return response.choices[0].message.content
             
@@ -49,6 +104,26 @@ class OpenAIClient:
             print(f"OpenAI API 호출 오류: {str(e)}")
             return None
     
+    def build_recommendation_request(
+        self, 
+        device_data: Dict[str, Any], 
+        customer_context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        디바이스 추천용 Chat Completions 요청 본문을 생성합니다.
+        동기 호출과 Batch API 작업이 같은 요청 형식을 사용하도록 공유됩니다.
+        """
+        prompt = self._build_prompt(device_data, customer_context)
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "당신은 CRM 기반 디바이스 마케팅 전문가입니다."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 500,
+        }
+    
     def _build_prompt(
         self, 
         device_data: Dict[str, Any], 
@@ -69,7 +144,12 @@ class OpenAIClient:
         return prompt
 
 
-def generate_marketing_copy(product: str, target: str, purpose: str) -> Optional[str]:
+def generate_marketing_copy(
+    product: str,
+    target: str,
+    purpose: str,
+    deadline: Optional[Deadline] = None
+) -> Optional[str]:
     """
     OpenAI ChatGPT API를 사용하여 마케팅 카피를 생성합니다.
     
@@ -77,32 +157,21 @@ def generate_marketing_copy(product: str, target: str, purpose: str) -> Optional
         product: 제품명
         target: 타겟 고객층
         purpose: 마케팅 목적
+        deadline: 전체 호출의 마감 시간 (선택사항)
     
     Returns:
         생성된 마케팅 카피 텍스트 또는 None
+    
+    Raises:
+        DeadlineExceeded: 호출 전에 마감 시간이 이미 지난 경우
     """
+    request = build_marketing_copy_request(product, target, purpose)
+    budget = deadline.timeout() if deadline is not None else None
+    
     try:
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        client = _with_budget(openai.OpenAI(api_key=OPENAI_API_KEY), budget)
         
-        prompt = f"""
-        다음 정보를 바탕으로 효과적인 마케팅 카피를 작성해주세요.
-        
-        제품명: {product}
-        타겟 고객층: {target}
-        마케팅 목적: {purpose}
-        
-        위 정보를 바탕으로 타겟 고객층에게 어필할 수 있는 매력적이고 설득력 있는 마케팅 카피를 작성해주세요.
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": "당신은 전문 마케팅 카피라이터입니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
+        response = client.chat.completions.create(**request)
         
         return response.choices[0].message.content
         
@@ -110,3 +179,35 @@ def generate_marketing_copy(product: str, target: str, purpose: str) -> Optional
         print(f"OpenAI API 호출 오류: {str(e)}")
         return None
 
+
+def build_marketing_copy_request(product: str, target: str, purpose: str) -> Dict[str, Any]:
+    """
+    마케팅 카피 생성용 Chat Completions 요청 본문을 생성합니다.
+    
+    Args:
+        product: 제품명
+        target: 타겟 고객층
+        purpose: 마케팅 목적
+    
+    Returns:
+        chat.completions.create 에 그대로 전달할 수 있는 요청 딕셔너리
+    """
+    prompt = f"""
+    다음 정보를 바탕으로 효과적인 마케팅 카피를 작성해주세요.
+    
+    제품명: {product}
+    타겟 고객층: {target}
+    마케팅 목적: {purpose}
+    
+    위 정보를 바탕으로 타겟 고객층에게 어필할 수 있는 매력적이고 설득력 있는 마케팅 카피를 작성해주세요.
+    """
+    return {
+        "model": "gpt-4-turbo",
+        "messages": [
+            {"role": "system", "content": "당신은 전문 마케팅 카피라이터입니다."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1000,
+    }
+
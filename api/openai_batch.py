@@ -0,0 +1,456 @@
+"""
+OpenAI Batch API 모듈
+대화형 응답이 필요 없는 추천/카피 생성 요청을 JSONL 배치 작업으로 묶어 제출하고,
+완료 여부를 폴링한 뒤 결과를 고객/디바이스 ID에 다시 매핑합니다.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import openai
+
+from config import Config
+from api.openai_api import OpenAIClient, build_marketing_copy_request
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# 배치가 더 이상 진행되지 않는 상태값
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# 끝난 요청의 결과 파일이 남는 종료 상태 (expired/cancelled 는 일부 요청만 처리됨)
+_READABLE_STATUSES = {"completed", "expired", "cancelled"}
+
+# Batch API 의 배치당 제한 (요청 수, 입력 파일 크기)
+MAX_REQUESTS_PER_BATCH = 50_000
+MAX_BATCH_BYTES = 200 * 1024 * 1024
+
+
+@dataclass
+class BatchJob:
+    """
+    제출된 배치 작업과 custom_id → 요청 키 매핑을 보관합니다.
+    요청이 Batch API 제한을 넘으면 여러 배치로 나뉘어 batch_ids 에 모두 기록됩니다.
+
+    배치는 최대 24시간 걸리므로, 제출 직후 save 로 파일에 기록해 두면 프로세스가 재시작되어도
+    load 로 작업을 복원해 wait 를 다시 호출할 수 있습니다. 요청 키는 문자열/숫자/None 이나
+    그 튜플이어야 합니다.
+    """
+
+    batch_ids: List[str]
+    kind: str
+    keys: Dict[str, Hashable] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON 으로 직렬화할 수 있는 딕셔너리로 변환합니다. 튜플 키는 리스트로 기록됩니다."""
+        return {
+            "batch_ids": list(self.batch_ids),
+            "kind": self.kind,
+            "keys": {custom_id: _key_to_json(key) for custom_id, key in self.keys.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchJob":
+        """to_dict 로 만든 딕셔너리에서 작업을 복원합니다."""
+        return cls(
+            batch_ids=list(data["batch_ids"]),
+            kind=data["kind"],
+            keys={custom_id: _key_from_json(key) for custom_id, key in data["keys"].items()},
+        )
+
+    def save(self, path: str) -> None:
+        """작업을 파일에 기록합니다. 쓰는 도중 중단되어도 기존 파일이 깨지지 않도록 교체 방식으로 저장합니다."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(self.to_dict(), fp, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BatchJob":
+        """save 로 기록한 작업을 읽어 옵니다."""
+        with open(path, "r", encoding="utf-8") as fp:
+            return cls.from_dict(json.load(fp))
+
+
+def _key_to_json(key: Hashable) -> Any:
+    if isinstance(key, tuple):
+        return [_key_to_json(item) for item in key]
+    if key is not None and not isinstance(key, (str, int, float)):
+        raise TypeError(f"JSON 으로 기록할 수 없는 요청 키입니다: {key!r}")
+    return key
+
+
+def _key_from_json(value: Any) -> Hashable:
+    if isinstance(value, list):
+        return tuple(_key_from_json(item) for item in value)
+    return value
+
+
+class OpenAIBatchClient:
+    """OpenAI Batch API 클라이언트"""
+
+    def __init__(
+        self,
+        config: Config,
+        client: Optional[Any] = None,
+        *,
+        max_requests_per_batch: int = MAX_REQUESTS_PER_BATCH,
+        max_batch_bytes: int = MAX_BATCH_BYTES,
+    ):
+        """
+        Args:
+            config: 애플리케이션 설정 인스턴스
+            client: openai.OpenAI 호환 클라이언트 (테스트 시 LocalBatchServer 전달)
+            max_requests_per_batch: 배치 하나에 담을 최대 요청 수
+            max_batch_bytes: 배치 하나의 최대 입력 파일 크기 (바이트)
+        """
+        self.config = config
+        self.client = client or openai.OpenAI(api_key=config.openai_api_key)
+        self.completion_window = "24h"
+        self.max_requests_per_batch = max_requests_per_batch
+        self.max_batch_bytes = max_batch_bytes
+        self._request_builder = OpenAIClient(config)
+
+    def submit_recommendations(
+        self,
+        requests: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+    ) -> BatchJob:
+        """
+        (고객 ID, 고객 컨텍스트, 디바이스) 목록을 디바이스 추천 배치로 제출합니다.
+
+        ID가 없는 디바이스는 결과를 구분할 수 없으므로 제출하지 않습니다.
+
+        Returns:
+            BatchJob: 결과 키가 (customer_id, device_id) 인 배치 작업
+        """
+        bodies: List[Tuple[Hashable, Dict[str, Any]]] = []
+        skipped = 0
+        for customer_id, customer_context, device in requests:
+            device_id = device.get("id")
+            if device_id is None:
+                skipped += 1
+                continue
+            body = self._request_builder.build_recommendation_request(device, customer_context)
+            bodies.append(((customer_id, device_id), body))
+        if skipped:
+            print(f"ID가 없는 디바이스 요청 {skipped}개는 배치에서 제외됩니다.")
+        return self._submit("recommendation", bodies)
+
+    def submit_marketing_copy(
+        self,
+        requests: Mapping[Hashable, Tuple[str, str, str]],
+    ) -> BatchJob:
+        """
+        키 → (제품명, 타겟 고객층, 마케팅 목적) 매핑을 마케팅 카피 배치로 제출합니다.
+
+        Returns:
+            BatchJob: 결과 키가 전달된 매핑의 키와 같은 배치 작업
+        """
+        bodies = [
+            (key, build_marketing_copy_request(product, target, purpose))
+            for key, (product, target, purpose) in requests.items()
+        ]
+        return self._submit("marketing_copy", bodies)
+
+    def wait(
+        self,
+        job: BatchJob,
+        *,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Dict[Hashable, Optional[str]]:
+        """
+        작업의 모든 배치가 끝날 때까지 폴링한 뒤 결과를 요청 키별로 합쳐 반환합니다.
+
+        expired/cancelled 로 끝난 배치도 처리된 요청의 결과는 읽어 오며,
+        처리되지 못한 요청과 failed 로 끝난 배치의 요청은 None 으로 남습니다.
+        실패한 배치가 있어도 다른 배치의 결과는 그대로 반환됩니다.
+
+        Args:
+            job: submit_* 로 생성된 배치 작업
+            poll_interval: 상태 조회 간격 (초)
+            timeout: 최대 대기 시간 (초, None이면 무제한)
+
+        Returns:
+            요청 키 → 응답 텍스트 딕셔너리 (실패하거나 처리되지 않은 요청은 None)
+
+        Raises:
+            TimeoutError: timeout 안에 배치가 끝나지 않은 경우
+        """
+        started = time.monotonic()
+        finished: Dict[str, Any] = {}
+        while True:
+            for batch_id in job.batch_ids:
+                if batch_id in finished:
+                    continue
+                batch = self.client.batches.retrieve(batch_id)
+                if batch.status in _TERMINAL_STATUSES:
+                    finished[batch_id] = batch
+            if len(finished) == len(job.batch_ids):
+                break
+            if timeout is not None and time.monotonic() - started >= timeout:
+                pending = ", ".join(batch_id for batch_id in job.batch_ids if batch_id not in finished)
+                raise TimeoutError(f"배치 작업이 시간 내에 완료되지 않았습니다: {pending}")
+            time.sleep(poll_interval)
+
+        results: Dict[Hashable, Optional[str]] = {key: None for key in job.keys.values()}
+        for batch_id in job.batch_ids:
+            batch = finished[batch_id]
+            if batch.status not in _READABLE_STATUSES:
+                print(f"배치 작업이 실패해 결과가 없습니다: {batch_id} ({batch.status})")
+                continue
+            if batch.status != "completed":
+                print(f"배치 작업이 {batch.status} 상태로 끝나 일부 요청만 처리되었습니다: {batch_id}")
+            self._read_results(batch.output_file_id, job, results)
+            self._read_results(batch.error_file_id, job, results)
+        return results
+
+    def _read_results(
+        self,
+        file_id: Optional[str],
+        job: BatchJob,
+        results: Dict[Hashable, Optional[str]],
+    ) -> None:
+        """출력/오류 파일의 각 줄을 요청 키에 매핑합니다. 실패한 요청은 로그를 남깁니다."""
+        if not file_id:
+            return
+
+        content = self.client.files.content(file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            key = job.keys.get(record.get("custom_id"))
+            if key is None:
+                continue
+            results[key] = self._extract_content(record)
+
+    def _submit(self, kind: str, bodies: List[Tuple[Hashable, Dict[str, Any]]]) -> BatchJob:
+        """
+        요청 본문을 JSONL 로 직렬화해 업로드하고 배치를 생성합니다.
+        요청 수나 파일 크기가 배치 제한을 넘으면 여러 배치로 나눠 제출합니다.
+        """
+        if not bodies:
+            raise ValueError("배치로 제출할 요청이 없습니다.")
+
+        keys: Dict[str, Hashable] = {}
+        batch_ids: List[str] = []
+        chunk: List[bytes] = []
+        chunk_bytes = 0
+        for index, (key, body) in enumerate(bodies):
+            # 고객/디바이스 ID에 어떤 문자가 와도 안전하도록 custom_id 는 순번으로 만들고
+            # 원래 키는 작업 객체에 보관합니다.
+            custom_id = f"{kind}-{index}"
+            keys[custom_id] = key
+            line = (json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": CHAT_COMPLETIONS_ENDPOINT,
+                "body": body,
+            }, ensure_ascii=False) + "\n").encode("utf-8")
+            if len(line) > self.max_batch_bytes:
+                raise ValueError(f"요청 하나가 배치 파일 크기 제한을 넘습니다: {key}")
+
+            if chunk and (
+                len(chunk) >= self.max_requests_per_batch
+                or chunk_bytes + len(line) > self.max_batch_bytes
+            ):
+                batch_ids.append(self._create_batch(kind, len(batch_ids), chunk))
+                chunk, chunk_bytes = [], 0
+            chunk.append(line)
+            chunk_bytes += len(line)
+
+        batch_ids.append(self._create_batch(kind, len(batch_ids), chunk))
+        return BatchJob(batch_ids=batch_ids, kind=kind, keys=keys)
+
+    def _create_batch(self, kind: str, part: int, lines: List[bytes]) -> str:
+        """JSONL 줄 목록을 업로드하고 배치 하나를 생성해 ID를 반환합니다."""
+        input_file = self.client.files.create(
+            file=(f"{kind}-{part}.jsonl", io.BytesIO(b"".join(lines))),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window=self.completion_window,
+            metadata={"kind": kind, "part": str(part)},
+        )
+        return batch.id
+
+    @staticmethod
+    def _extract_content(record: Dict[str, Any]) -> Optional[str]:
+        """배치 출력/오류 파일 한 줄에서 응답 텍스트를 꺼냅니다. 실패한 요청은 로그를 남기고 None을 반환합니다."""
+        custom_id = record.get("custom_id")
+        if record.get("error"):
+            print(f"OpenAI 배치 요청 오류 ({custom_id}): {record['error']}")
+            return None
+
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            body = response.get("body") or {}
+            error = body.get("error") if isinstance(body, dict) else None
+            detail = error.get("message") if isinstance(error, dict) else error
+            print(f"OpenAI 배치 요청 실패 ({custom_id}): {response.get('status_code')} {detail or ''}".rstrip())
+            return None
+
+        try:
+            return response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+
+@dataclass
+class _LocalObject:
+    """LocalBatchServer 가 반환하는 속성 접근용 객체."""
+
+    id: str
+    status: str = ""
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    text: str = ""
+
+
+class LocalBatchServer:
+    """
+    테스트와 로컬 실행을 위한 OpenAI Batch API 대체 서버.
+
+    openai.OpenAI 의 files / batches 인터페이스 중 OpenAIBatchClient 가 사용하는
+    부분만 흉내 내며, 각 요청 본문은 responder 함수로 처리합니다.
+    배치는 polls_until_complete 번 조회된 뒤 final_status 상태로 끝납니다.
+    실제 API 와 마찬가지로 성공한 요청은 출력 파일에, responder 가 예외를 던진 요청은
+    오류 파일에 기록되며, failed 로 끝난 배치는 결과 파일이 없습니다.
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[Dict[str, Any]], str]] = None,
+        *,
+        polls_until_complete: int = 1,
+        final_status: Union[str, Sequence[str]] = "completed",
+        max_processed: Optional[int] = None,
+    ):
+        """
+        Args:
+            responder: 요청 본문을 받아 응답 텍스트를 반환하는 함수 (기본값은 에코)
+            polls_until_complete: 배치가 끝나기까지 필요한 조회 횟수
+            final_status: 배치의 종료 상태 (expired/cancelled 등을 흉내 낼 때 사용).
+                목록을 전달하면 생성된 순서대로 배치마다 다른 상태를 사용합니다.
+            max_processed: 지정하면 completed 가 아닌 배치는 앞쪽 요청 이만큼만 처리하고
+                나머지는 처리하지 않은 채로 끝납니다.
+        """
+        self.responder = responder or self._echo
+        self.polls_until_complete = polls_until_complete
+        self.final_status = final_status
+        self.max_processed = max_processed
+        self._files: Dict[str, str] = {}
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self.files = _LocalFiles(self)
+        self.batches = _LocalBatches(self)
+
+    @staticmethod
+    def _echo(body: Dict[str, Any]) -> str:
+        """기본 응답: 마지막 사용자 메시지를 그대로 돌려줍니다."""
+        return body["messages"][-1]["content"].strip()
+
+    def _status_for(self, part: int) -> str:
+        """part 번째로 생성된 배치의 종료 상태를 반환합니다."""
+        if isinstance(self.final_status, str):
+            return self.final_status
+        return self.final_status[part]
+
+    def _run(self, input_file_id: str, status: str) -> Tuple[Optional[str], Optional[str]]:
+        """입력 JSONL 을 처리해 출력/오류 파일을 만들고 (출력 파일 ID, 오류 파일 ID)를 반환합니다."""
+        if status == "failed":
+            return None, None
+
+        lines = [line for line in self._files[input_file_id].splitlines() if line.strip()]
+        if status != "completed" and self.max_processed is not None:
+            lines = lines[:self.max_processed]
+
+        output: List[str] = []
+        errors: List[str] = []
+        for line in lines:
+            request = json.loads(line)
+            try:
+                content = self.responder(request["body"])
+                record = {
+                    "id": f"batch_req_{uuid.uuid4().hex}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"role": "assistant", "content": content}}]},
+                    },
+                    "error": None,
+                }
+                output.append(json.dumps(record, ensure_ascii=False))
+            except Exception as exc:
+                record = {
+                    "id": f"batch_req_{uuid.uuid4().hex}",
+                    "custom_id": request["custom_id"],
+                    "response": None,
+                    "error": {"message": str(exc)},
+                }
+                errors.append(json.dumps(record, ensure_ascii=False))
+
+        return self._store(output), self._store(errors)
+
+    def _store(self, lines: List[str]) -> Optional[str]:
+        """JSONL 줄 목록을 파일로 저장하고 ID를 반환합니다. 빈 목록이면 None을 반환합니다."""
+        if not lines:
+            return None
+        file_id = f"file-{uuid.uuid4().hex}"
+        self._files[file_id] = "\n".join(lines) + "\n"
+        return file_id
+
+
+class _LocalFiles:
+    """LocalBatchServer.files 네임스페이스"""
+
+    def __init__(self, server: LocalBatchServer):
+        self._server = server
+
+    def create(self, *, file: Tuple[str, io.BytesIO], purpose: str) -> _LocalObject:
+        _, stream = file
+        file_id = f"file-{uuid.uuid4().hex}"
+        self._server._files[file_id] = stream.read().decode("utf-8")
+        return _LocalObject(id=file_id)
+
+    def content(self, file_id: str) -> _LocalObject:
+        return _LocalObject(id=file_id, text=self._server._files[file_id])
+
+
+class _LocalBatches:
+    """LocalBatchServer.batches 네임스페이스"""
+
+    def __init__(self, server: LocalBatchServer):
+        self._server = server
+
+    def create(self, *, input_file_id: str, endpoint: str, completion_window: str, **_: Any) -> _LocalObject:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        self._server._batches[batch_id] = {
+            "input_file_id": input_file_id,
+            "status": self._server._status_for(len(self._server._batches)),
+            "polls": 0,
+            "files": None,
+        }
+        return _LocalObject(id=batch_id, status="validating")
+
+    def retrieve(self, batch_id: str) -> _LocalObject:
+        state = self._server._batches[batch_id]
+        state["polls"] += 1
+        if state["files"] is None and state["polls"] >= self._server.polls_until_complete:
+            state["files"] = self._server._run(state["input_file_id"], state["status"])
+        if state["files"] is None:
+            return _LocalObject(id=batch_id, status="in_progress")
+        output_file_id, error_file_id = state["files"]
+        return _LocalObject(
+            id=batch_id,
+            status=state["status"],
+            output_file_id=output_file_id,
+            error_file_id=error_file_id,
+        )
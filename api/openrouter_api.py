@@ -11,6 +11,7 @@ from typing import Any, Dict, Optional
 import requests
 
 from config import Config
+from api.latency import Deadline, resolve_timeout
 
 
 class OpenRouterClient:
@@ -29,21 +30,31 @@ class OpenRouterClient:
         if not self.api_key:
             raise ValueError("OpenRouter API 키가 설정되어 있지 않습니다.")
 
-    def post(self, path: str, *, json: Dict[str, Any], timeout: int = 60) -> Dict[str, Any]:
+    def post(
+        self,
+        path: str,
+        *,
+        json: Dict[str, Any],
+        timeout: float = 60,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """
         OpenRouter API에 POST 요청을 전송합니다.
 
         Args:
             path: 호출할 엔드포인트 경로 (예: "/chat/completions")
             json: 전송할 JSON 페이로드
-            timeout: 요청 타임아웃 (초)
+            timeout: 요청 타임아웃 상한 (초)
+            deadline: 전체 호출의 마감 시간. 지정하면 남은 예산이 timeout 보다 작을 때 그 값을 사용합니다.
 
         Returns:
             dict: 파싱된 JSON 응답
 
         Raises:
             RuntimeError: HTTP 에러 또는 요청 예외 발생 시
+            DeadlineExceeded: 호출 전에 마감 시간이 이미 지난 경우
         """
+        timeout = resolve_timeout(deadline, timeout)
         url = f"{self.base_url}{path}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -60,15 +71,22 @@ class OpenRouterClient:
         except requests.exceptions.RequestException as exc:
             raise RuntimeError(f"OpenRouter API 요청 중 오류: {exc}") from exc
 
-    def create_chat_completion(self, payload: Dict[str, Any], *, timeout: int = 60) -> Dict[str, Any]:
+    def create_chat_completion(
+        self,
+        payload: Dict[str, Any],
+        *,
+        timeout: float = 60,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
         """
         OpenRouter의 Chat Completions 엔드포인트를 호출합니다.
 
         Args:
             payload: OpenRouter Chat Completion 형식의 JSON 페이로드
-            timeout: 요청 타임아웃 (초)
+            timeout: 요청 타임아웃 상한 (초)
+            deadline: 전체 호출의 마감 시간
         """
-        return self.post("/chat/completions", json=payload, timeout=timeout)
+        return self.post("/chat/completions", json=payload, timeout=timeout, deadline=deadline)
 
     @staticmethod
     def _parse_json(response: requests.Response) -> Dict[str, Any]:
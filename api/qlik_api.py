@@ -2,16 +2,30 @@
 Qlik API 모듈
 Qlik API를 통해 데이터를 가져오고 처리합니다.
 """
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from config import Config
+from api.latency import Deadline, LatencyTracker, hedged_call, resolve_timeout
+from api.qlik_records import CustomerRecord, DeviceCatalog, FeatureVocabulary
+
+# 마감 시간이 없을 때 사용하는 요청별 기본 타임아웃 (초)
+DEFAULT_TIMEOUT = 30
 
 
 class QlikClient:
     """Qlik API 클라이언트"""
     
-    def __init__(self, config: Config):
-        """Qlik 클라이언트를 초기화합니다."""
+    def __init__(self, config: Config, hedge: bool = False):
+        """
+        Qlik 클라이언트를 초기화합니다.
+        
+        Args:
+            config: 애플리케이션 설정 인스턴스
+            hedge: True이면 조회 요청이 최근 p95 지연 시간 안에 끝나지 않을 때
+                같은 요청을 한 번 더 보내 먼저 도착한 응답을 사용합니다.
+        """
         self.config = config
         self.base_url = config.qlik_server
         self.app_id = config.qlik_app_id
@@ -20,13 +34,61 @@ class QlikClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        # 클라이언트가 변환한 모든 레코드가 같은 키/값 ID를 공유합니다.
+        # 사전에는 필드 키와 preferences/features 의 값만 등록되므로 크기가 스키마 범위로 제한됩니다.
+        self.vocabulary = FeatureVocabulary()
+        self.hedge = hedge
+        # 응답 크기가 크게 다른 엔드포인트(카탈로그 전체 조회, 고객 단건 조회)의 지연 시간이 섞이지 않도록
+        # 경로 템플릿별로 따로 기록하고, 헤지 기준(p95)도 엔드포인트별로 계산합니다.
+        self.latency: Dict[str, LatencyTracker] = {}
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="qlik-hedge") if hedge else None
+    
+    def _get(
+        self,
+        url: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> requests.Response:
+        """
+        GET 요청을 보냅니다. 요청 타임아웃은 마감 시간의 남은 예산에서 계산되며,
+        헤지가 켜져 있으면 같은 엔드포인트의 p95 지연 시간을 넘긴 요청을 한 번 더 보냅니다.
+        
+        Args:
+            url: 요청 URL
+            endpoint: 지연 시간을 집계할 경로 템플릿 (예: "/customers/{customer_id}")
+            params: 쿼리 파라미터
+            deadline: 전체 호출의 마감 시간
+        """
+        tracker = self.latency.setdefault(endpoint, LatencyTracker())
+        
+        def attempt() -> requests.Response:
+            started = time.monotonic()
+            response = requests.get(
+                url,
+                headers=self.headers,
+                params=params,
+                timeout=resolve_timeout(deadline, DEFAULT_TIMEOUT)
+            )
+            response.raise_for_status()
+            tracker.record(time.monotonic() - started)
+            return response
+        
+        if self._executor is None:
+            return attempt()
+        return hedged_call(attempt, self._executor, tracker.percentile(0.95), deadline)
     
-    def get_device_data(self, device_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_device_data(
+        self,
+        device_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
         """
         디바이스 데이터를 Qlik에서 가져옵니다.
         
         Args:
             device_id: 특정 디바이스 ID (선택사항)
+            deadline: 전체 호출의 마감 시간 (선택사항)
         
         Returns:
             디바이스 데이터 리스트
@@ -35,16 +97,13 @@ class QlikClient:
             url = f"{self.base_url}/api/v1/apps/{self.app_id}/data"
             
             params = {}
+            endpoint = "/data"
             if device_id:
                 params["device_id"] = device_id
+                # 단건 조회는 전체 카탈로그 조회와 지연 시간 분포가 다르므로 따로 집계합니다.
+                endpoint = "/data?device_id={device_id}"
             
-            response = requests.get(
-                url,
-                headers=self.headers,
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
+            response = self._get(url, endpoint, params=params, deadline=deadline)
             
             return response.json().get("data", [])
             
@@ -52,12 +111,17 @@ class QlikClient:
             print(f"Qlik API 호출 오류: {str(e)}")
             return []
     
-    def get_customer_data(self, customer_id: str) -> Optional[Dict[str, Any]]:
+    def get_customer_data(
+        self,
+        customer_id: str,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         고객 데이터를 Qlik에서 가져옵니다.
         
         Args:
             customer_id: 고객 ID
+            deadline: 전체 호출의 마감 시간 (선택사항)
         
         Returns:
             고객 데이터 딕셔너리 또는 None
@@ -65,16 +129,47 @@ class QlikClient:
         try:
             url = f"{self.base_url}/api/v1/apps/{self.app_id}/customers/{customer_id}"
             
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=30
-            )
-            response.raise_for_status()
+            response = self._get(url, "/customers/{customer_id}", deadline=deadline)
             
             return response.json()
             
         except requests.exceptions.RequestException as e:
             print(f"Qlik API 호출 오류: {str(e)}")
             return None
-
+    
+    def get_device_catalog(
+        self,
+        device_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> DeviceCatalog:
+        """
+        디바이스 데이터를 가져와 열 단위 카탈로그로 변환합니다.
+        
+        Args:
+            device_id: 특정 디바이스 ID (선택사항)
+            deadline: 전체 호출의 마감 시간 (선택사항)
+        
+        Returns:
+            디바이스 카탈로그 (조회 실패 시 빈 카탈로그)
+        """
+        return DeviceCatalog.from_raw(self.get_device_data(device_id, deadline=deadline), self.vocabulary)
+    
+    def get_customer_record(
+        self,
+        customer_id: str,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[CustomerRecord]:
+        """
+        고객 데이터를 가져와 레코드로 변환합니다.
+        
+        Args:
+            customer_id: 고객 ID
+            deadline: 전체 호출의 마감 시간 (선택사항)
+        
+        Returns:
+            고객 레코드 또는 None
+        """
+        customer_data = self.get_customer_data(customer_id, deadline=deadline)
+        if not customer_data:
+            return None
+        return CustomerRecord.from_raw(customer_data, self.vocabulary)
@@ -0,0 +1,434 @@
+"""
+Qlik 레코드 모듈
+Qlik JSON 으로 받은 고객/디바이스 데이터를 메모리 효율적인 형태로 보관합니다.
+
+선호도(preferences)/특성(features) 매핑의 키와 값은 FeatureVocabulary 를 통해 정수 ID로 인턴되며,
+(키 ID, 값 ID) 쌍은 하나의 64비트 코드로 묶여 비교됩니다. 그 밖의 필드는 값의 종류가 무한히
+늘어날 수 있으므로(이름, 전화번호, 시각 등) 사전에 등록하지 않고 값 그대로 보관합니다.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# 키 ID는 상위 32비트, 값 ID는 하위 32비트에 저장합니다.
+_VALUE_BITS = 32
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+
+
+def _normalize(value: Any) -> Any:
+    """
+    == 로 같은 값이 같은 형태가 되도록 정규화합니다.
+    (True == 1 == 1.0 이므로 bool 과 정수값 float 는 int 로 맞춥니다.)
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _copy_value(value: Any) -> Any:
+    """컨테이너 값은 복사해 레코드 간에 같은 객체가 공유되지 않도록 합니다."""
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+class FeatureVocabulary:
+    """
+    특성 키와 값을 정수 ID로 인턴하는 사전.
+
+    값 ID는 원래 값을 그대로 복원할 수 있도록 타입까지 구분하고(1 과 1.0 은 다른 ID),
+    비교에는 == 기준으로 같은 값끼리 같은 일치 ID(match id)를 사용합니다.
+    """
+
+    __slots__ = ("_key_ids", "_keys", "_value_ids", "_values", "_match_ids", "_match_index")
+
+    def __init__(self) -> None:
+        self._key_ids: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._value_ids: Dict[str, int] = {}
+        self._values: List[Any] = []
+        self._match_ids = array("L")
+        self._match_index: Dict[str, int] = {}
+
+    def key_id(self, key: str) -> int:
+        """키 문자열의 ID를 반환합니다. 처음 보는 키는 새로 등록합니다."""
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            key = sys.intern(str(key))
+            self._key_ids[key] = key_id
+            self._keys.append(key)
+        return key_id
+
+    def key(self, key_id: int) -> str:
+        return self._keys[key_id]
+
+    def value_id(self, value: Any) -> int:
+        """값의 ID를 반환합니다. 중첩 구조는 정규화된 JSON 기준으로 동일성을 판단합니다."""
+        canonical = _canonical(value)
+        value_id = self._value_ids.get(canonical)
+        if value_id is None:
+            value_id = len(self._values)
+            self._value_ids[canonical] = value_id
+            self._values.append(value)
+            self._match_ids.append(self._match_index.setdefault(
+                _canonical(_normalize(value)), len(self._match_index)
+            ))
+        return value_id
+
+    def encode(self, mapping: Dict[str, Any]) -> Tuple[int, ...]:
+        """딕셔너리를 정렬된 (키, 값) 코드 튜플로 변환합니다."""
+        return tuple(sorted(
+            (self.key_id(key) << _VALUE_BITS) | self.value_id(value)
+            for key, value in mapping.items()
+        ))
+
+    def decode(self, codes: Iterable[int]) -> Dict[str, Any]:
+        """encode 로 만든 코드를 다시 딕셔너리로 복원합니다. 컨테이너 값은 복사본을 반환합니다."""
+        return {
+            self._keys[code >> _VALUE_BITS]: _copy_value(self._values[code & _VALUE_MASK])
+            for code in codes
+        }
+
+    def match_code(self, code: int) -> int:
+        """코드를 == 기준 비교용 코드로 변환합니다."""
+        return (code & ~_VALUE_MASK) | self._match_ids[code & _VALUE_MASK]
+
+
+def count_matches(
+    preference_codes: frozenset,
+    feature_codes: Iterable[int],
+    vocabulary: FeatureVocabulary,
+) -> int:
+    """
+    고객 선호와 디바이스 특성 중 키가 같고 값이 == 로 같은 항목 수를 셉니다.
+
+    Args:
+        preference_codes: 고객 선호 비교용 코드 집합 (CustomerRecord.preference_set())
+        feature_codes: 디바이스 특성 코드
+        vocabulary: 두 코드를 만든 사전
+    """
+    match_code = vocabulary.match_code
+    return sum(1 for code in feature_codes if match_code(code) in preference_codes)
+
+
+class _CompactRecord:
+    """
+    ID, 코드로 보관하는 중첩 매핑 하나, 나머지 최상위 필드를 보관하는 레코드의 공통 구현.
+
+    나머지 필드는 키만 사전 ID로 보관하고, 값은 사전에 등록하지 않고 그대로 둡니다.
+    """
+
+    __slots__ = ("vocabulary", "mapping_codes", "attribute_keys", "attribute_values")
+
+    # 하위 클래스에서 코드로 보관할 중첩 매핑 필드명과 슬롯으로 보관할 필드를 지정합니다.
+    mapping_field = ""
+    column_fields: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        vocabulary: FeatureVocabulary,
+        mapping_codes: Optional[Sequence[int]],
+        attribute_keys: Sequence[int],
+        attribute_values: Sequence[Any],
+    ):
+        self.vocabulary = vocabulary
+        self.mapping_codes = mapping_codes
+        self.attribute_keys = attribute_keys
+        self.attribute_values = attribute_values
+
+    @classmethod
+    def _split(
+        cls,
+        raw: Dict[str, Any],
+        vocabulary: FeatureVocabulary,
+    ) -> Tuple[Optional[Tuple[int, ...]], Tuple[int, ...], Tuple[Any, ...]]:
+        """
+        원본 딕셔너리를 (매핑 코드, 필드 키 ID, 필드 값)으로 나눕니다.
+        열로 보관하는 필드는 제외합니다.
+        """
+        mapping = raw.get(cls.mapping_field)
+        if not isinstance(mapping, dict):
+            # 예상과 다른 형식은 손실 없이 일반 필드로 보관합니다.
+            mapping = None
+
+        keys: List[int] = []
+        values: List[Any] = []
+        for key, value in raw.items():
+            if key in cls.column_fields or (key == cls.mapping_field and mapping is not None):
+                continue
+            keys.append(vocabulary.key_id(key))
+            # 반복되는 문자열 값은 인턴으로 공유합니다. 인턴 문자열은 참조가 사라지면 해제됩니다.
+            values.append(sys.intern(value) if isinstance(value, str) else value)
+
+        mapping_codes = vocabulary.encode(mapping) if mapping is not None else None
+        return mapping_codes, tuple(keys), tuple(values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Qlik 원본과 같은 형태의 딕셔너리로 복원합니다. 반환값은 레코드와 공유되지 않습니다."""
+        data = self._column_values()
+        for key_id, value in zip(self.attribute_keys, self.attribute_values):
+            data[self.vocabulary.key(key_id)] = _copy_value(value)
+        if self.mapping_codes is not None:
+            data[self.mapping_field] = self.vocabulary.decode(self.mapping_codes)
+        return data
+
+    def _column_values(self) -> Dict[str, Any]:
+        """슬롯으로 보관한 필드를 딕셔너리로 반환합니다."""
+        return {}
+
+    def content_hash(self) -> str:
+        """
+        레코드 내용의 해시를 반환합니다.
+        인턴 ID는 프로세스마다 달라지므로 복원한 딕셔너리를 정규화해 계산하며,
+        실행 간에 저장해 두고 비교할 수 있습니다.
+        """
+        canonical = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """딕셔너리처럼 최상위 필드를 조회합니다."""
+        return self.to_dict().get(key, default)
+
+
+class CustomerRecord(_CompactRecord):
+    """고객 데이터 레코드. preferences 는 코드로 보관됩니다."""
+
+    __slots__ = ("customer_id",)
+
+    mapping_field = "preferences"
+    column_fields = ("id",)
+
+    def __init__(
+        self,
+        customer_id: Any,
+        vocabulary: FeatureVocabulary,
+        mapping_codes: Optional[Sequence[int]],
+        attribute_keys: Sequence[int],
+        attribute_values: Sequence[Any],
+    ):
+        super().__init__(vocabulary, mapping_codes, attribute_keys, attribute_values)
+        self.customer_id = customer_id
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any], vocabulary: FeatureVocabulary) -> "CustomerRecord":
+        """
+        Qlik 고객 JSON 을 레코드로 변환합니다.
+        ID는 원본 값 그대로 보관하며(정수 ID는 정수로), 원본에 ID가 없으면 customer_id 는 None 입니다.
+        """
+        mapping_codes, attribute_keys, attribute_values = cls._split(raw, vocabulary)
+        return cls(
+            customer_id=_intern_optional(raw.get("id")),
+            vocabulary=vocabulary,
+            mapping_codes=mapping_codes,
+            attribute_keys=attribute_keys,
+            attribute_values=attribute_values,
+        )
+
+    def _column_values(self) -> Dict[str, Any]:
+        return {"id": self.customer_id} if self.customer_id is not None else {}
+
+    @property
+    def preference_codes(self) -> Sequence[int]:
+        return self.mapping_codes or ()
+
+    def preference_set(self) -> frozenset:
+        """선호도 비교용 코드 집합을 반환합니다 (count_matches 에 전달)."""
+        return frozenset(self.vocabulary.match_code(code) for code in self.preference_codes)
+
+
+class DeviceRecord(_CompactRecord):
+    """디바이스 데이터 레코드. features 는 코드로 보관됩니다."""
+
+    __slots__ = ("device_id", "name")
+
+    mapping_field = "features"
+    column_fields = ("id", "name")
+
+    def __init__(
+        self,
+        device_id: Optional[str],
+        name: Optional[str],
+        vocabulary: FeatureVocabulary,
+        mapping_codes: Optional[Sequence[int]],
+        attribute_keys: Sequence[int],
+        attribute_values: Sequence[Any],
+    ):
+        super().__init__(vocabulary, mapping_codes, attribute_keys, attribute_values)
+        self.device_id = device_id
+        self.name = name
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any], vocabulary: FeatureVocabulary) -> "DeviceRecord":
+        """Qlik 디바이스 JSON 을 레코드로 변환합니다."""
+        mapping_codes, attribute_keys, attribute_values = cls._split(raw, vocabulary)
+        return cls(
+            device_id=_intern_optional(raw.get("id")),
+            name=_intern_optional(raw.get("name")),
+            vocabulary=vocabulary,
+            mapping_codes=mapping_codes,
+            attribute_keys=attribute_keys,
+            attribute_values=attribute_values,
+        )
+
+    def _column_values(self) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        if self.device_id is not None:
+            values["id"] = self.device_id
+        if self.name is not None:
+            values["name"] = self.name
+        return values
+
+    @property
+    def feature_codes(self) -> Sequence[int]:
+        return self.mapping_codes or ()
+
+
+def _intern_optional(value: Any) -> Any:
+    """문자열이면 인턴하고, 그 외 값은 그대로 반환합니다."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _ColumnarTable:
+    """
+    레코드 목록을 열 단위 배열로 보관하는 컨테이너의 공통 구현.
+
+    중첩 매핑 코드와 나머지 필드의 키 ID는 각각 하나의 배열에, 필드 값은 하나의 리스트에
+    이어 붙이고, 레코드별 시작 위치를 오프셋 배열로 관리합니다 (CSR 형식).
+    """
+
+    __slots__ = (
+        "vocabulary",
+        "ids",
+        "_mapping_offsets",
+        "_mapping_codes",
+        "_has_mapping",
+        "_attribute_offsets",
+        "_attribute_keys",
+        "_attribute_values",
+    )
+
+    def __init__(self, vocabulary: FeatureVocabulary):
+        self.vocabulary = vocabulary
+        self.ids: List[Any] = []
+        self._mapping_offsets = array("Q", [0])
+        self._mapping_codes = array("Q")
+        self._has_mapping = bytearray()
+        self._attribute_offsets = array("Q", [0])
+        self._attribute_keys = array("L")
+        self._attribute_values: List[Any] = []
+
+    def _append_record(self, record_id: Any, record: _CompactRecord) -> None:
+        self.ids.append(record_id)
+        self._has_mapping.append(record.mapping_codes is not None)
+        self._mapping_codes.extend(record.mapping_codes or ())
+        self._mapping_offsets.append(len(self._mapping_codes))
+        self._attribute_keys.extend(record.attribute_keys)
+        self._attribute_values.extend(record.attribute_values)
+        self._attribute_offsets.append(len(self._attribute_keys))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _mapping_slice(self, index: int) -> Optional[array]:
+        if not self._has_mapping[index]:
+            return None
+        return self._mapping_codes[self._mapping_offsets[index]:self._mapping_offsets[index + 1]]
+
+    def _attribute_slice(self, index: int) -> Tuple[array, List[Any]]:
+        start, end = self._attribute_offsets[index], self._attribute_offsets[index + 1]
+        return self._attribute_keys[start:end], self._attribute_values[start:end]
+
+
+class DeviceCatalog(_ColumnarTable):
+    """디바이스 카탈로그 전체를 열 단위로 보관합니다."""
+
+    __slots__ = ("names",)
+
+    def __init__(self, vocabulary: FeatureVocabulary):
+        super().__init__(vocabulary)
+        self.names: List[Any] = []
+
+    @classmethod
+    def from_raw(cls, devices: Iterable[Dict[str, Any]], vocabulary: FeatureVocabulary) -> "DeviceCatalog":
+        """Qlik 디바이스 JSON 목록을 카탈로그로 변환합니다."""
+        catalog = cls(vocabulary)
+        for raw in devices:
+            catalog.append(DeviceRecord.from_raw(raw, vocabulary))
+        return catalog
+
+    def append(self, record: DeviceRecord) -> None:
+        self._append_record(record.device_id, record)
+        self.names.append(record.name)
+
+    def feature_codes(self, index: int) -> Sequence[int]:
+        """index 번째 디바이스의 특성 코드를 레코드 생성 없이 반환합니다."""
+        return self._mapping_slice(index) or ()
+
+    def __getitem__(self, index: int) -> DeviceRecord:
+        attribute_keys, attribute_values = self._attribute_slice(index)
+        return DeviceRecord(
+            device_id=self.ids[index],
+            name=self.names[index],
+            vocabulary=self.vocabulary,
+            mapping_codes=self._mapping_slice(index),
+            attribute_keys=attribute_keys,
+            attribute_values=attribute_values,
+        )
+
+    def __iter__(self) -> Iterator[DeviceRecord]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class CustomerSegment(_ColumnarTable):
+    """고객 세그먼트를 열 단위로 보관합니다."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_raw(cls, customers: Iterable[Dict[str, Any]], vocabulary: FeatureVocabulary) -> "CustomerSegment":
+        """Qlik 고객 JSON 목록을 세그먼트로 변환합니다."""
+        segment = cls(vocabulary)
+        for raw in customers:
+            segment.append(CustomerRecord.from_raw(raw, vocabulary))
+        return segment
+
+    def append(self, record: CustomerRecord) -> None:
+        self._append_record(record.customer_id, record)
+
+    def preference_codes(self, index: int) -> Sequence[int]:
+        """index 번째 고객의 선호 코드를 레코드 생성 없이 반환합니다."""
+        return self._mapping_slice(index) or ()
+
+    def preference_set(self, index: int) -> frozenset:
+        """index 번째 고객의 선호도 비교용 코드 집합을 반환합니다 (count_matches 에 전달)."""
+        return frozenset(self.vocabulary.match_code(code) for code in self.preference_codes(index))
+
+    def __getitem__(self, index: int) -> CustomerRecord:
+        attribute_keys, attribute_values = self._attribute_slice(index)
+        return CustomerRecord(
+            customer_id=self.ids[index],
+            vocabulary=self.vocabulary,
+            mapping_codes=self._mapping_slice(index),
+            attribute_keys=attribute_keys,
+            attribute_values=attribute_values,
+        )
+
+    def __iter__(self) -> Iterator[CustomerRecord]:
+        for index in range(len(self)):
+            yield self[index]
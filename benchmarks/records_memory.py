@@ -0,0 +1,119 @@
+"""
+레코드 메모리 벤치마크
+Qlik JSON 딕셔너리 목록과 DeviceCatalog / CustomerSegment 의 메모리 사용량을 비교합니다.
+
+실행 방법 (저장소 루트에서):
+    python -m benchmarks.records_memory --devices 5000 --customers 50000
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+from api.qlik_records import CustomerSegment, DeviceCatalog, FeatureVocabulary
+
+_FEATURES = {
+    "network": ["5G", "LTE"],
+    "storage": ["128GB", "256GB", "512GB", "1TB"],
+    "color": ["black", "silver", "blue", "green", "purple"],
+    "brand": ["samsung", "apple", "google", "xiaomi"],
+    "foldable": [True, False],
+    "price_tier": ["entry", "mid", "premium", "flagship"],
+    "camera": ["dual", "triple", "quad"],
+    "screen": ["6.1", "6.4", "6.7", "6.9"],
+}
+
+_SEGMENTS = ["vip", "youth", "family", "senior", "business"]
+
+
+def _make_devices(count: int, rng: random.Random) -> str:
+    devices = [
+        {
+            "id": f"DEV-{index:06d}",
+            "name": f"Device {index}",
+            "category": rng.choice(["phone", "tablet", "watch"]),
+            "price": rng.randrange(200, 2000, 10) * 1000,
+            "features": {key: rng.choice(values) for key, values in _FEATURES.items()},
+        }
+        for index in range(count)
+    ]
+    return json.dumps({"data": devices})
+
+
+def _make_customers(count: int, rng: random.Random) -> str:
+    customers = [
+        {
+            "id": f"CUST-{index:08d}",
+            "segment": rng.choice(_SEGMENTS),
+            "age_band": rng.choice(["10s", "20s", "30s", "40s", "50s", "60s"]),
+            "plan": rng.choice(["basic", "standard", "unlimited"]),
+            "preferences": {
+                key: rng.choice(values)
+                for key, values in rng.sample(sorted(_FEATURES.items()), 4)
+            },
+        }
+        for index in range(count)
+    ]
+    return json.dumps({"data": customers})
+
+
+def _measure(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """build 가 만든 객체가 유지하는 메모리(바이트)를 측정합니다."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def run(device_count: int, customer_count: int, seed: int = 0) -> Dict[str, Dict[str, int]]:
+    """
+    벤치마크를 실행하고 항목별 (원본, 압축) 바이트 수를 반환합니다.
+
+    두 측정 모두 Qlik 응답 JSON 파싱부터 시작합니다. 압축 표현은 파싱 결과를 변환한 뒤
+    버린 상태에서 측정하므로, 파싱 결과의 문자열/값 객체를 재사용한 부분도 모두 압축 표현의
+    비용으로 집계됩니다.
+    """
+    rng = random.Random(seed)
+    device_json = _make_devices(device_count, rng)
+    customer_json = _make_customers(customer_count, rng)
+
+    report: Dict[str, Dict[str, int]] = {}
+    for label, payload, table_cls in (
+        ("devices", device_json, DeviceCatalog),
+        ("customers", customer_json, CustomerSegment),
+    ):
+        raw, raw_bytes = _measure(lambda: json.loads(payload)["data"])
+        del raw
+        # 어휘 사전도 압축 표현의 비용에 포함합니다.
+        compact, compact_bytes = _measure(
+            lambda: table_cls.from_raw(json.loads(payload)["data"], FeatureVocabulary())
+        )
+        report[label] = {"raw": raw_bytes, "compact": compact_bytes}
+        del compact
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Qlik 레코드 메모리 벤치마크")
+    parser.add_argument("--devices", type=int, default=5000)
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run(args.devices, args.customers, args.seed)
+    for label, sizes in report.items():
+        raw_mb = sizes["raw"] / 1024 / 1024
+        compact_mb = sizes["compact"] / 1024 / 1024
+        reduction = 1 - sizes["compact"] / sizes["raw"] if sizes["raw"] else 0.0
+        print(f"{label:<10} dict: {raw_mb:8.2f} MB  compact: {compact_mb:8.2f} MB  감소율: {reduction:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
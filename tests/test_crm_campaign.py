@@ -0,0 +1,155 @@
+"""CampaignSession 단계 메모이즈와 문안 수정 반영 테스트."""
+
+import re
+
+import pytest
+
+from agent.crm_campaign import CampaignSession
+
+
+class FakeOpenAIClient:
+    """프롬프트 종류별로 기획전 정보가 드러나는 응답을 돌려주는 가짜 클라이언트."""
+
+    def __init__(self):
+        self.segment_count = 5
+        self.image_prompt_count = 3
+        self.revisions = []
+
+    def complete(self, system_prompt, user_prompt, temperature=0.7, max_tokens=1000, deadline=None):
+        brief = self._section(user_prompt, "기획전 정보:")
+        if "수정 요청에 맞게" in user_prompt:
+            text = self._section(user_prompt, "현재 문안:")
+            instruction = self._section(user_prompt, "수정 요청:")
+            self.revisions.append((text, instruction))
+            return f"{text} +{instruction}"
+        if "타겟 고객군 5개" in user_prompt:
+            return "\n".join(f"{index + 1}. {brief} 고객군 {index}" for index in range(self.segment_count))
+        if "문안을 작성" in user_prompt:
+            devices = re.search(r"추천 디바이스: (.*)", user_prompt).group(1)
+            return f"{brief} 문안 ({devices})"
+        if "이미지 생성 프롬프트" in user_prompt:
+            return "\n".join(f"- {brief} image {index}" for index in range(self.image_prompt_count))
+        if "SQL" in user_prompt:
+            return f"SELECT * FROM customers -- {self._section(user_prompt, '타겟 고객군:')}"
+        raise AssertionError(f"예상하지 못한 프롬프트입니다: {user_prompt}")
+
+    @staticmethod
+    def _section(prompt, header):
+        lines = [line.strip() for line in prompt.splitlines()]
+        if header not in lines:
+            return ""
+        return lines[lines.index(header) + 1]
+
+
+class FakeImageGenerator:
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt, deadline=None, **_):
+        self.prompts.append(prompt)
+        return [{"url": f"image://{prompt}"}]
+
+
+class FakeRecommendationEngine:
+    def recommend_devices_for_customer(self, customer_id, deadline=None):
+        return {"customer_id": customer_id, "recommendations": [{"device_name": f"phone-{customer_id}"}]}
+
+
+@pytest.fixture
+def session():
+    return CampaignSession(
+        FakeOpenAIClient(),
+        FakeImageGenerator(),
+        FakeRecommendationEngine(),
+        brief="여름 기획전",
+    )
+
+
+def _counts(session):
+    return dict(session.workflow.compute_counts)
+
+
+def test_copy_edit_does_not_regenerate_image_or_sql(session):
+    session.dispatch()
+    before = _counts(session)
+
+    message = session.revise_copy("더 짧게")
+    result = session.dispatch()
+
+    after = _counts(session)
+    assert message == "여름 기획전 문안 (없음) +더 짧게"
+    assert result["message"] == message
+    changed = {name for name in after if after[name] != before[name]}
+    assert changed == {"message", "dispatch"}
+    assert session.image_generator.prompts == ["여름 기획전 image 0"]
+
+
+def test_copy_edits_are_applied_incrementally(session):
+    session.revise_copy("더 짧게")
+    session.revise_copy("이모지 추가")
+
+    assert session.openai_client.revisions == [
+        ("여름 기획전 문안 (없음)", "더 짧게"),
+        ("여름 기획전 문안 (없음) +더 짧게", "이모지 추가"),
+    ]
+    assert session.message() == "여름 기획전 문안 (없음) +더 짧게 +이모지 추가"
+
+
+def test_edits_are_replayed_when_base_copy_changes(session):
+    session.revise_copy("더 짧게")
+    session.revise_copy("이모지 추가")
+    session.openai_client.revisions.clear()
+
+    session.set_sample_customers(["c1"])
+
+    assert session.message() == "여름 기획전 문안 (phone-c1) +더 짧게 +이모지 추가"
+    assert [instruction for _, instruction in session.openai_client.revisions] == ["더 짧게", "이모지 추가"]
+
+
+def test_segment_choice_recomputes_only_target_sql(session):
+    session.dispatch()
+    before = _counts(session)
+
+    session.select_segment(2)
+    result = session.dispatch()
+
+    after = _counts(session)
+    changed = {name for name in after if after[name] != before[name]}
+    assert changed == {"target_sql", "dispatch"}
+    assert result["target_sql"].endswith("여름 기획전 고객군 2")
+
+
+def test_brief_change_recomputes_everything_downstream(session):
+    session.revise_copy("더 짧게")
+    session.dispatch()
+    before = _counts(session)
+
+    session.set_brief("겨울 기획전")
+    result = session.dispatch()
+
+    after = _counts(session)
+    for name in ("segments", "copy", "message", "image_prompts", "image", "target_sql", "dispatch"):
+        assert after[name] == before[name] + 1, name
+    assert after["featured_devices"] == before["featured_devices"]
+    assert result["message"] == "겨울 기획전 문안 (없음)"
+
+
+def test_brief_change_resets_choices_when_candidates_shrink(session):
+    session.select_image_prompt(2)
+    session.select_segment(4)
+    session.generate_image()
+    session.target_sql()
+
+    session.openai_client.image_prompt_count = 1
+    session.openai_client.segment_count = 1
+    session.set_brief("겨울 기획전")
+
+    assert session.generate_image() == [{"url": "image://겨울 기획전 image 0"}]
+    assert session.target_sql().endswith("겨울 기획전 고객군 0")
+
+
+def test_out_of_range_selection_raises(session):
+    with pytest.raises(ValueError):
+        session.select_image_prompt(3)
+    with pytest.raises(ValueError):
+        session.select_segment(-1)
@@ -0,0 +1,135 @@
+"""SpeculativeImageCache 선행 생성 테스트."""
+
+import threading
+import time
+
+import pytest
+
+from agent.crm_image_generator import SpeculativeImageCache
+
+
+class FakeGenerator:
+    """release 가 호출될 때까지 생성을 멈춰 둘 수 있는 가짜 이미지 생성기."""
+
+    def __init__(self, blocking=False, failing=()):
+        self.calls = []
+        self.started = threading.Semaphore(0)
+        self.failing = set(failing)
+        self._release = threading.Event()
+        if not blocking:
+            self._release.set()
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, deadline=None, **_):
+        with self._lock:
+            self.calls.append(prompt)
+        self.started.release()
+        self._release.wait(timeout=5)
+        if prompt in self.failing:
+            self.failing.discard(prompt)
+            raise ValueError(f"failed: {prompt}")
+        return [{"url": f"image://{prompt}"}]
+
+    def release(self):
+        self._release.set()
+
+    def wait_started(self, count):
+        for _ in range(count):
+            assert self.started.acquire(timeout=5)
+
+
+@pytest.fixture
+def caches():
+    created = []
+
+    def make(generator, **options):
+        cache = SpeculativeImageCache(generator, **options)
+        created.append((cache, generator))
+        return cache
+
+    yield make
+    for cache, generator in created:
+        generator.release()
+        cache.shutdown()
+
+
+def test_get_attaches_to_in_flight_result(caches):
+    generator = FakeGenerator(blocking=True)
+    cache = caches(generator)
+    cache.propose(["a", "b"])
+    generator.wait_started(1)
+
+    threading.Timer(0.05, generator.release).start()
+    assert cache.get("a") == [{"url": "image://a"}]
+
+    assert generator.calls == ["a"]
+    assert cache.spent == 0
+    # 사용된 결과는 캐시에 남지 않습니다.
+    assert cache._entries == {}
+
+
+def test_budget_caps_unused_speculation(caches):
+    generator = FakeGenerator(blocking=True)
+    cache = caches(generator, budget=2.0)
+
+    cache.propose(["a"])
+    generator.wait_started(1)
+    cache.propose(["b"])
+    generator.wait_started(1)
+    cache.propose(["c"])
+
+    # a, b 는 이미 시작되어 취소할 수 없으므로 예산을 모두 쓴 상태입니다.
+    assert cache.spent == 2.0
+    assert "c" not in cache._entries
+    assert generator.calls == ["a", "b"]
+
+
+def test_budget_window_resets_wasted_cost(caches):
+    generator = FakeGenerator()
+    cache = caches(generator, budget=1.0, budget_window=0.05)
+
+    cache.propose(["a"])
+    generator.wait_started(1)
+    cache.propose(["b"])
+    assert "b" not in cache._entries
+
+    time.sleep(0.06)
+    cache.propose(["b"])
+    assert "b" in cache._entries
+
+
+def test_cancelled_unstarted_work_is_refunded(caches):
+    generator = FakeGenerator(blocking=True)
+    cache = caches(generator, top_k=2, budget=5.0, max_workers=1)
+
+    cache.propose(["a", "b"])
+    generator.wait_started(1)
+    assert cache.spent == 2.0
+
+    cache.cancel_unused()
+
+    # 실행 중인 a 는 취소할 수 없고, 대기 중이던 b 만 취소되어 비용이 돌아옵니다.
+    assert cache.spent == 1.0
+    assert cache._entries == {}
+
+
+def test_expired_results_are_regenerated(caches):
+    generator = FakeGenerator()
+    cache = caches(generator, ttl=0.05)
+
+    cache.propose(["a"])
+    generator.wait_started(1)
+    time.sleep(0.06)
+
+    assert cache.get("a") == [{"url": "image://a"}]
+    assert generator.calls == ["a", "a"]
+
+
+def test_failed_speculation_falls_back_to_new_generation(caches):
+    generator = FakeGenerator(failing={"a"})
+    cache = caches(generator)
+
+    cache.propose(["a"])
+
+    assert cache.get("a") == [{"url": "image://a"}]
+    assert generator.calls == ["a", "a"]
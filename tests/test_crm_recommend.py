@@ -0,0 +1,128 @@
+"""refresh_recommendations 증분 갱신과 RecommendationStore 테스트."""
+
+import copy
+
+from api.qlik_records import CustomerRecord, DeviceCatalog, FeatureVocabulary
+from agent.crm_recommend import CRMRecommendationEngine
+from agent.recommendation_store import RecommendationStore
+
+
+class FakeQlikClient:
+    def __init__(self, devices, customers):
+        self.vocabulary = FeatureVocabulary()
+        self.devices = devices
+        self.customers = customers
+
+    def get_device_catalog(self, device_id=None, deadline=None):
+        return DeviceCatalog.from_raw(copy.deepcopy(self.devices), self.vocabulary)
+
+    def get_customer_record(self, customer_id, deadline=None):
+        raw = self.customers.get(customer_id)
+        return CustomerRecord.from_raw(copy.deepcopy(raw), self.vocabulary) if raw else None
+
+
+class FakeOpenAIClient:
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+
+    def generate_recommendation(self, device_data, customer_context, deadline=None):
+        pair = (customer_context["id"], device_data["id"])
+        self.calls.append(pair)
+        if pair in self.failing:
+            return None
+        return f"{pair[1]} for {pair[0]} at {device_data['price']}"
+
+
+def _setup():
+    devices = [
+        {"id": "d1", "name": "alpha", "price": 100, "features": {"network": "5G"}},
+        {"id": "d2", "name": "beta", "price": 200, "features": {"network": "LTE"}},
+    ]
+    customers = {
+        "c1": {"id": "c1", "preferences": {"network": "5G"}},
+        "c2": {"id": "c2", "preferences": {"network": "LTE"}},
+    }
+    qlik = FakeQlikClient(devices, customers)
+    openai = FakeOpenAIClient()
+    return qlik, openai, CRMRecommendationEngine(openai, qlik)
+
+
+def test_device_change_recomputes_only_that_device():
+    qlik, openai, engine = _setup()
+    store = RecommendationStore()
+    engine.refresh_recommendations(["c1", "c2"], store)
+    assert len(openai.calls) == 4
+
+    openai.calls.clear()
+    qlik.devices[1]["price"] = 150
+    results = engine.refresh_recommendations(["c1", "c2"], store)
+
+    assert sorted(openai.calls) == [("c1", "d2"), ("c2", "d2")]
+    texts = {item["device_id"]: item["recommendation"] for item in results["c1"]["recommendations"]}
+    assert texts == {"d1": "d1 for c1 at 100", "d2": "d2 for c1 at 150"}
+
+
+def test_customer_change_recomputes_that_customer():
+    qlik, openai, engine = _setup()
+    store = RecommendationStore()
+    engine.refresh_recommendations(["c1", "c2"], store)
+
+    openai.calls.clear()
+    qlik.customers["c1"]["preferences"] = {"network": "LTE"}
+    engine.refresh_recommendations(["c1", "c2"], store)
+
+    assert sorted(openai.calls) == [("c1", "d1"), ("c1", "d2")]
+
+
+def test_removed_devices_are_pruned():
+    qlik, openai, engine = _setup()
+    store = RecommendationStore()
+    engine.refresh_recommendations(["c1"], store)
+
+    openai.calls.clear()
+    del qlik.devices[0]
+    results = engine.refresh_recommendations(["c1"], store)
+
+    assert openai.calls == []
+    assert set(store.get_entries("c1")) == {"d2"}
+    assert [item["device_id"] for item in results["c1"]["recommendations"]] == ["d2"]
+
+
+def test_failed_generation_is_retried():
+    qlik, openai, engine = _setup()
+    store = RecommendationStore()
+    openai.failing.add(("c1", "d2"))
+    engine.refresh_recommendations(["c1"], store)
+    assert set(store.get_entries("c1")) == {"d1"}
+
+    openai.calls.clear()
+    openai.failing.clear()
+    engine.refresh_recommendations(["c1"], store)
+
+    assert openai.calls == [("c1", "d2")]
+    assert set(store.get_entries("c1")) == {"d1", "d2"}
+
+
+def test_devices_without_id_are_skipped():
+    qlik, openai, engine = _setup()
+    qlik.devices.append({"name": "gamma", "price": 300})
+    store = RecommendationStore()
+
+    engine.refresh_recommendations(["c1"], store)
+
+    assert sorted(openai.calls) == [("c1", "d1"), ("c1", "d2")]
+
+
+def test_store_round_trips_through_file(tmp_path):
+    qlik, openai, engine = _setup()
+    path = str(tmp_path / "recommendations.json")
+    engine.refresh_recommendations(["c1", "c2"], RecommendationStore(path))
+
+    openai.calls.clear()
+    reloaded = RecommendationStore(path)
+    results = engine.refresh_recommendations(["c1", "c2"], reloaded)
+
+    assert openai.calls == []
+    assert reloaded.get_customer_hash("c1") == qlik.get_customer_record("c1").content_hash()
+    assert len(results["c2"]["recommendations"]) == 2
@@ -0,0 +1,48 @@
+"""hedged_call 과 Deadline 테스트."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.latency import Deadline, DeadlineExceeded, hedged_call
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=False)
+
+
+def test_fast_failure_is_not_retried(executor):
+    attempts = []
+
+    def not_found():
+        attempts.append(1)
+        raise LookupError("404")
+
+    with pytest.raises(LookupError):
+        hedged_call(not_found, executor, hedge_after=0.2)
+    assert len(attempts) == 1
+
+
+def test_slow_first_attempt_is_hedged(executor):
+    lock = threading.Lock()
+    attempts = []
+
+    def request():
+        with lock:
+            attempts.append(1)
+            number = len(attempts)
+        time.sleep(1.0 if number == 1 else 0.05)
+        return number
+
+    assert hedged_call(request, executor, hedge_after=0.1) == 2
+    assert len(attempts) == 2
+
+
+def test_expired_deadline_raises():
+    with pytest.raises(DeadlineExceeded):
+        Deadline.after(-1).timeout()
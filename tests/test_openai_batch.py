@@ -0,0 +1,109 @@
+"""OpenAIBatchClient 와 LocalBatchServer 왕복 테스트."""
+
+from config import Config
+from api.openai_batch import BatchJob, LocalBatchServer, OpenAIBatchClient
+
+
+def _device_responder(body):
+    """사용자 프롬프트에 포함된 디바이스 이름으로 응답하고, 'broken' 디바이스는 실패시킵니다."""
+    prompt = body["messages"][-1]["content"]
+    if "broken" in prompt:
+        raise ValueError("responder failure")
+    for name in ("alpha", "beta"):
+        if name in prompt:
+            return f"recommend {name}"
+    return "unknown"
+
+
+def _requests():
+    customer = {"id": "c:1", "preferences": {"network": "5G"}}
+    return [
+        ("c:1", customer, {"id": "d1", "name": "alpha"}),
+        ("c:1", customer, {"id": "d2", "name": "beta"}),
+        ("c:1", customer, {"id": "d3", "name": "broken"}),
+    ]
+
+
+def test_round_trip_maps_results_to_keys():
+    server = LocalBatchServer(_device_responder, polls_until_complete=3)
+    client = OpenAIBatchClient(Config(), client=server)
+
+    job = client.submit_recommendations(_requests())
+    results = client.wait(job, poll_interval=0)
+
+    assert len(job.batch_ids) == 1
+    assert server._batches[job.batch_ids[0]]["polls"] == 3
+    assert results == {
+        ("c:1", "d1"): "recommend alpha",
+        ("c:1", "d2"): "recommend beta",
+        ("c:1", "d3"): None,
+    }
+
+
+def test_requests_over_limit_are_split_and_merged():
+    server = LocalBatchServer(_device_responder)
+    client = OpenAIBatchClient(Config(), client=server, max_requests_per_batch=2)
+
+    job = client.submit_recommendations(_requests())
+    results = client.wait(job, poll_interval=0)
+
+    assert len(job.batch_ids) == 2
+    assert results[("c:1", "d1")] == "recommend alpha"
+    assert results[("c:1", "d2")] == "recommend beta"
+    assert results[("c:1", "d3")] is None
+
+
+def test_expired_batch_returns_partial_results():
+    server = LocalBatchServer(_device_responder, final_status="expired", max_processed=1)
+    client = OpenAIBatchClient(Config(), client=server)
+
+    job = client.submit_marketing_copy({
+        "seg-a": ("alpha", "20대", "신규 가입"),
+        "seg-b": ("beta", "30대", "기기 변경"),
+    })
+    results = client.wait(job, poll_interval=0)
+
+    assert results == {"seg-a": "recommend alpha", "seg-b": None}
+
+
+def test_failed_batch_keeps_results_of_other_batches():
+    server = LocalBatchServer(_device_responder, final_status=["completed", "failed"])
+    client = OpenAIBatchClient(Config(), client=server, max_requests_per_batch=2)
+
+    job = client.submit_recommendations(_requests())
+    results = client.wait(job, poll_interval=0)
+
+    assert results == {
+        ("c:1", "d1"): "recommend alpha",
+        ("c:1", "d2"): "recommend beta",
+        ("c:1", "d3"): None,
+    }
+
+
+def test_devices_without_id_are_not_submitted():
+    server = LocalBatchServer(_device_responder)
+    client = OpenAIBatchClient(Config(), client=server)
+    customer = {"id": "c:1"}
+
+    job = client.submit_recommendations([
+        ("c:1", customer, {"id": "d1", "name": "alpha"}),
+        ("c:1", customer, {"name": "beta"}),
+        ("c:1", customer, {"name": "gamma"}),
+    ])
+
+    assert list(job.keys.values()) == [("c:1", "d1")]
+
+
+def test_saved_job_can_be_resumed(tmp_path):
+    server = LocalBatchServer(_device_responder, polls_until_complete=2)
+    job = OpenAIBatchClient(Config(), client=server).submit_recommendations(_requests())
+    path = str(tmp_path / "job.json")
+    job.save(path)
+
+    # 재시작된 프로세스처럼 새 클라이언트와 파일에서 읽은 작업으로 결과를 받습니다.
+    restored = BatchJob.load(path)
+    results = OpenAIBatchClient(Config(), client=server).wait(restored, poll_interval=0)
+
+    assert restored == job
+    assert results[("c:1", "d1")] == "recommend alpha"
+    assert results[("c:1", "d3")] is None
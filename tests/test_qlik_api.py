@@ -0,0 +1,37 @@
+"""QlikClient 엔드포인트별 지연 시간 집계 테스트."""
+
+import time
+
+import api.qlik_api as qlik_api
+from config import Config
+from api.qlik_api import QlikClient
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def test_latency_is_tracked_per_endpoint(monkeypatch):
+    def fake_get(url, headers=None, params=None, timeout=None):
+        if url.endswith("/data"):
+            time.sleep(0.02)
+            return _FakeResponse({"data": [{"id": "d1"}]})
+        return _FakeResponse({"id": url.rsplit("/", 1)[-1]})
+
+    monkeypatch.setattr(qlik_api.requests, "get", fake_get)
+    client = QlikClient(Config(), hedge=True)
+    for index in range(20):
+        client.get_device_data()
+        client.get_customer_data(f"c{index}")
+
+    assert set(client.latency) == {"/data", "/customers/{customer_id}"}
+    catalog_p95 = client.latency["/data"].percentile(0.95)
+    customer_p95 = client.latency["/customers/{customer_id}"].percentile(0.95)
+    assert customer_p95 < 0.01 <= catalog_p95
@@ -0,0 +1,35 @@
+"""CustomerRecord / DeviceCatalog / CustomerSegment 변환 테스트."""
+
+from api.qlik_records import CustomerRecord, CustomerSegment, DeviceCatalog, FeatureVocabulary, count_matches
+
+
+def test_customer_record_round_trips_raw_json():
+    vocabulary = FeatureVocabulary()
+    for raw in (
+        {"id": 42, "segment": "vip", "preferences": {"network": "5G"}},
+        {"segment": "youth", "preferences": {}},
+    ):
+        record = CustomerRecord.from_raw(raw, vocabulary)
+        assert record.to_dict() == raw
+        assert record.customer_id == raw.get("id")
+
+
+def test_to_dict_does_not_share_containers():
+    vocabulary = FeatureVocabulary()
+    record = CustomerRecord.from_raw({"id": "c1", "tags": ["a"], "preferences": {"colors": ["blue"]}}, vocabulary)
+
+    data = record.to_dict()
+    data["tags"].append("b")
+    data["preferences"]["colors"].append("red")
+
+    assert record.to_dict() == {"id": "c1", "tags": ["a"], "preferences": {"colors": ["blue"]}}
+
+
+def test_matches_follow_equality():
+    vocabulary = FeatureVocabulary()
+    catalog = DeviceCatalog.from_raw([{"id": "d1", "features": {"foldable": True, "storage": 256}}], vocabulary)
+    segment = CustomerSegment.from_raw([{"id": "c1", "preferences": {"foldable": 1, "storage": 256.0}}], vocabulary)
+
+    assert count_matches(segment.preference_set(0), catalog.feature_codes(0), vocabulary) == 2
+    assert catalog[0].to_dict()["features"] == {"foldable": True, "storage": 256}
+    assert segment[0].to_dict()["preferences"] == {"foldable": 1, "storage": 256.0}